@@ -0,0 +1,94 @@
+"""
+Per-file CSV ingestion benchmark of the SEU, MaFauldDa and MUET digestors.
+
+Synthetic files mimicking the layout of each dataset are generated in a temporary directory, then parsed both with the
+former loaders (SEU: readlines() + str.split(); MaFauldDa/MUET: pd.read_csv() of all columns) and with the numeric
+loader of the digestors, for a subset of the channels.
+
+Run from the directory containing the damavand repository:
+
+	python -m damavand.benchmarks.csv_loading --rows 250000 --repeats 3
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from damavand.damavand.datasets.digestors import _read_numeric_csv
+
+
+def _former_seu(path, channels, delimiter):
+	with open(path, 'r', encoding='gb18030', errors='ignore') as f:
+		content = f.readlines()
+		arr = np.array([i.split(delimiter)[:-1] for i in content[16:]]).astype(float)
+	return {key: arr[:, key] for key in channels}
+
+def _former_mafaulda(path, channels):
+	df = pd.read_csv(path, header = None)
+	return {key: df[key].values for key in channels}
+
+def _former_muet(path, channels):
+	df = pd.read_csv(path)
+	return {key: df.iloc[:, key].to_numpy() for key in channels}
+
+def write_fixtures(directory, rows, seed = 0):
+	"""
+	Write one synthetic file per dataset layout into `directory`; returns a dict of file paths.
+	"""
+	rng = np.random.default_rng(seed)
+	paths = {name: os.path.join(directory, name + '.csv') for name in ['SEU', 'MaFauldDa', 'MUET']}
+
+	with open(paths['SEU'], 'w', encoding = 'gb18030') as f:
+		for i in range(16):
+			f.write(f'数据头 {i}\n')
+		np.savetxt(f, rng.standard_normal((rows, 8)), fmt = '%.6f', delimiter = '\t', newline = '\t\n')
+	np.savetxt(paths['MaFauldDa'], rng.standard_normal((rows, 8)), fmt = '%.6f', delimiter = ',')
+	pd.DataFrame(rng.standard_normal((rows, 4)), columns = ['time', 'x', 'y', 'z']).to_csv(paths['MUET'], index = False)
+	return paths
+
+def _best_of(func, repeats):
+	timings = []
+	for _ in range(repeats):
+		start = time.perf_counter()
+		func()
+		timings.append(time.perf_counter() - start)
+	return min(timings)
+
+def run(rows = 250000, repeats = 3):
+	"""
+	Time the former and the current loaders; returns a list of dicts, one per dataset.
+	"""
+	with tempfile.TemporaryDirectory() as directory:
+		paths = write_fixtures(directory, rows)
+		cases = {
+			'SEU': (
+				lambda: _former_seu(paths['SEU'], [0, 3], '\t'),
+				lambda: _read_numeric_csv(paths['SEU'], [0, 3], delimiter = '\t', skiprows = 16, encoding = 'gb18030'),
+			),
+			'MaFauldDa': (
+				lambda: _former_mafaulda(paths['MaFauldDa'], [1, 2]),
+				lambda: _read_numeric_csv(paths['MaFauldDa'], [1, 2]),
+			),
+			'MUET': (
+				lambda: _former_muet(paths['MUET'], [1]),
+				lambda: _read_numeric_csv(paths['MUET'], [1], header = 0),
+			),
+		}
+
+		results = []
+		for name, (former, current) in cases.items():
+			former_time, current_time = _best_of(former, repeats), _best_of(current, repeats)
+			results.append({'dataset': name, 'rows': rows, 'former_s': former_time, 'current_s': current_time, 'speedup': former_time / current_time})
+		return results
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description = __doc__.strip().splitlines()[0])
+	parser.add_argument('--rows', type = int, default = 250000, help = 'number of samples per synthetic file')
+	parser.add_argument('--repeats', type = int, default = 3, help = 'number of timed runs per loader; the best one is reported')
+	args = parser.parse_args()
+
+	print(pd.DataFrame(run(args.rows, args.repeats)).to_string(index = False, float_format = '%.3f'))
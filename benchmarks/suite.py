@@ -0,0 +1,261 @@
+"""
+Benchmark suite of the hot paths of damavand: splitting, mining, transforms, features and augmentations.
+
+Every case runs in a fresh process, on synthetic inputs generated locally from a fixed seed (for mining, .mat and .csv files
+mimicking the layout of the KAIST, CWRU, PU and MaFauldDa datasets), and is timed over several runs for each input size. The
+throughput (windows/s), the timings and the peak resident memory (RSS) of each case are printed, and optionally written to a
+JSON file, which can be compared to the one of another run (e.g. of a former commit) to spot regressions.
+
+Run from the directory containing the damavand repository:
+
+	python -m damavand.benchmarks.suite --sizes 1000 10000 --output after.json --compare before.json
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy
+import scipy.io
+
+try:
+	import resource
+except ImportError:  # not available on Windows
+	resource = None
+
+from damavand.damavand.utils import splitter
+from damavand.damavand.datasets.digestors import KAIST, CWRU, PU, MaFauldDa
+from damavand.damavand.signal_processing.transformations import fft, zoomed_fft, stft, env, envelope_spectrum
+from damavand.damavand.signal_processing.feature_extraction import feature_extractor, StreamingFeatures, rms, smsa, peak, crest_factor, clearance_factor, shape_factor, impulse_factor
+from damavand.damavand.augmentations import gaussian_noise, masking_noise, AugmentationPipeline
+
+WIN_LEN = 2048
+HOP_LEN = 1024
+SAMPLING_FREQ = 12000
+N_FILES = 4
+SEED = 0
+
+TIME_FEATURES = {func.__name__: (func, (), {}) for func in [rms, smsa, peak, crest_factor, clearance_factor, shape_factor, impulse_factor]}
+
+
+# Synthetic fixtures; a file holds `n_windows` windows of WIN_LEN samples per channel
+
+def _n_samples(n_windows):
+	return WIN_LEN + (n_windows - 1) * HOP_LEN
+
+def _signals(rng, n_samples, n_channels):
+	# a resonance modulated by periodic impacts, plus noise, so that the envelope holds a fault frequency
+	t = np.arange(n_samples) / SAMPLING_FREQ
+	carrier = (1 + 0.8 * np.cos(2 * np.pi * 107 * t)) * np.sin(2 * np.pi * 3000 * t)
+	return carrier[:, None] + 0.3 * rng.standard_normal((n_samples, n_channels))
+
+def _write_kaist(directory, n_windows, rng):
+	for name in ['0Nm_Normal.mat', '0Nm_BPFI_03.mat', '2Nm_BPFO_10.mat', '4Nm_Misalign_01.mat'][:N_FILES]:
+		signals = _signals(rng, _n_samples(n_windows), 4)
+		scipy.io.savemat(os.path.join(directory, name), {'Signal': {'x_values': np.arange(3), 'y_values': {'values': signals}}})
+	return lambda: KAIST(directory, ['0Nm_Normal.mat', '0Nm_BPFI_03.mat', '2Nm_BPFO_10.mat', '4Nm_Misalign_01.mat'][:N_FILES], [0, 1]), {'win_len': WIN_LEN, 'hop_len': HOP_LEN}
+
+def _write_cwru(directory, n_windows, rng):
+	for i, name in enumerate(['normal_1797_12K.mat', 'DE_IR_007_1797_12K.mat', 'DE_OR_014_1772_12K.mat', 'FE_B_021_1750_12K.mat'][:N_FILES]):
+		signals = _signals(rng, _n_samples(n_windows), 2)
+		scipy.io.savemat(os.path.join(directory, name), {f'X{100 + i}_DE_time': signals[:, :1], f'X{100 + i}_FE_time': signals[:, 1:], f'X{100 + i}RPM': 1797})
+	return lambda: CWRU(directory, ['FE', 'DE']), {'12K': {'win_len': WIN_LEN, 'hop_len': HOP_LEN}}
+
+def _write_pu(directory, n_windows, rng):
+	names = ['CP1', 'CP2', 'speed', 'torque', 'temp', 'force', 'Vib']
+	for folder in ['K001', 'KA01']:
+		os.makedirs(os.path.join(directory, folder), exist_ok = True)
+		for rep in range(1, N_FILES // 2 + 1):
+			stem = f'N15_M07_F10_{folder}_{rep}'
+			signals = _signals(rng, _n_samples(n_windows), len(names))
+			channels = np.zeros((1, len(names)), dtype = [('Name', 'O'), ('Raster', 'O'), ('Data', 'O')])
+			for i, name in enumerate(names):
+				channels[0, i] = (name, 'HostService', signals[:, i][None])
+			scipy.io.savemat(os.path.join(directory, folder, stem + '.mat'), {stem: {'Info': 'synthetic', 'X': 0, 'Y': channels}})
+	return lambda: PU(directory, ['K001', 'KA01'], ['CP1', 'Vib'], list(range(1, N_FILES // 2 + 1))), {'win_len': WIN_LEN, 'hop_len': HOP_LEN}
+
+def _write_mafaulda(directory, n_windows, rng):
+	for folder in ['normal', 'imbalance/6g']:
+		os.makedirs(os.path.join(directory, folder), exist_ok = True)
+		for i in range(N_FILES // 2):
+			np.savetxt(os.path.join(directory, folder, f'{i}.csv'), _signals(rng, _n_samples(n_windows), 8), fmt = '%.6f', delimiter = ',')
+	return lambda: MaFauldDa(directory, ['normal', 'imbalance'], [1, 2]), {'win_len': WIN_LEN, 'hop_len': HOP_LEN}
+
+DATASETS = {'KAIST': _write_kaist, 'CWRU': _write_cwru, 'PU': _write_pu, 'MaFauldDa': _write_mafaulda}
+
+def write_fixtures(directory, dataset, n_windows, seed = SEED):
+	"""
+	Write the synthetic files of a dataset into `directory`, so that each of its mined channels holds about `n_windows` windows.
+
+	Returns a `(make, mining_params)` tuple, where `make()` instantiates the digestor of the files.
+	"""
+	os.makedirs(directory, exist_ok = True)
+	return DATASETS[dataset](directory, max(1, n_windows // N_FILES), np.random.default_rng(seed))
+
+
+# Cases; each one maps an input size to a `(run, n_windows)` tuple, where run() is the timed callable
+
+def _windows(n_windows):
+	return _signals(np.random.default_rng(SEED), WIN_LEN, n_windows).T.copy()
+
+def _count_windows(data):
+	if isinstance(data, dict):
+		return sum(_count_windows(value) for value in data.values())
+	if isinstance(data, list):
+		return sum(len(frame) for frame in data)
+	return len(data)
+
+def _mining_case(dataset):
+	def case(size, directory):
+		make, mining_params = write_fixtures(os.path.join(directory, dataset, ''), dataset, size)
+		counted = make()
+		counted.mine(mining_params)
+		return lambda: make().mine(mining_params), _count_windows(counted.data)
+	return case
+
+def _splitter_case(as_view):
+	def case(size, directory):
+		signal = _signals(np.random.default_rng(SEED), _n_samples(size), 1)[:, 0]
+		return lambda: splitter(signal, WIN_LEN, HOP_LEN, as_view = as_view), size
+	return case
+
+def _block_case(func, **kwargs):
+	def case(size, directory):
+		windows = _windows(size)
+		return lambda: func(windows, **kwargs), size
+	return case
+
+def _dataframe_case(func, **kwargs):
+	def case(size, directory):
+		windows = pd.DataFrame(_windows(size))
+		return lambda: func(windows, **kwargs), size
+	return case
+
+def _streaming_features_case(size, directory):
+	stream = _signals(np.random.default_rng(SEED), _n_samples(size), 1)[:, 0]
+	chunks = np.split(stream, np.arange(HOP_LEN, len(stream), HOP_LEN))
+	def run():
+		extractor = StreamingFeatures(TIME_FEATURES, WIN_LEN, HOP_LEN)
+		for chunk in chunks:
+			extractor.update(chunk, return_df = False)
+	return run, size
+
+CASES = {
+	('splitter', 'copy'): _splitter_case(False),
+	('splitter', 'view'): _splitter_case(True),
+	**{('mine', dataset): _mining_case(dataset) for dataset in DATASETS},
+	('transform', 'fft'): _block_case(fft, window = 'hann', return_df = False),
+	('transform', 'fft_float32'): _block_case(fft, window = 'hann', return_df = False, dtype = np.float32),
+	('transform', 'zoomed_fft'): _block_case(zoomed_fft, f_min = 0, f_max = 500, desired_len = 512, sampling_freq = SAMPLING_FREQ, window = 'hann', return_df = False),
+	('transform', 'stft'): _block_case(stft, window_len = 256, hop_len = 128, window = 'hann'),
+	('transform', 'env'): _block_case(env, return_df = False),
+	('transform', 'env_fft'): _block_case(lambda windows: fft(env(windows, return_df = False), return_df = False)),
+	('transform', 'envelope_spectrum'): _block_case(envelope_spectrum, sampling_freq = SAMPLING_FREQ, band = (2500, 3500), f_max = 500, decimate = True, return_df = False),
+	('features', 'feature_extractor'): _dataframe_case(feature_extractor, features = TIME_FEATURES),
+	('features', 'streaming'): _streaming_features_case,
+	('augmentation', 'gaussian_noise'): _dataframe_case(gaussian_noise, SNR_level = 10, rng = np.random.default_rng(SEED)),
+	('augmentation', 'masking_noise'): _dataframe_case(masking_noise, ratio = 0.1, rng = np.random.default_rng(SEED)),
+	('augmentation', 'pipeline'): _block_case(AugmentationPipeline([(gaussian_noise, {'SNR_level': 10}, 0.5), (masking_noise, {'ratio': 0.1}, 0.5)], seed = SEED)),
+}
+
+
+# Measurement
+
+def _peak_rss_mb():
+	if resource is None:
+		return None
+	peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return peak_rss / 2**20 if sys.platform == 'darwin' else peak_rss / 2**10  # bytes on macOS, KiB elsewhere
+
+def measure(stage, case, size, repeats = 3, directory = None):
+	"""
+	Time a case over `repeats` runs (after a warm-up one), in the current process; returns a dict of results.
+
+	`peak_rss_mb` is the peak RSS of the process, and `setup_rss_mb` the one reached while preparing the inputs (and, for mining, the
+	fixtures); only meaningful in a fresh process (see `run`).
+	"""
+	# the progress messages of the digestors are silenced
+	with tempfile.TemporaryDirectory(dir = directory) as directory, open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+		func, n_windows = CASES[(stage, case)](size, directory)
+		setup_rss = _peak_rss_mb()
+
+		func()
+		timings = []
+		for _ in range(repeats):
+			start = time.perf_counter()
+			func()
+			timings.append(time.perf_counter() - start)
+
+	return {
+		'stage': stage, 'case': case, 'size': size, 'windows': n_windows, 'repeats': repeats,
+		'best_s': min(timings), 'median_s': float(np.median(timings)), 'windows_per_s': n_windows / min(timings),
+		'setup_rss_mb': setup_rss, 'peak_rss_mb': _peak_rss_mb(),
+	}
+
+def run(sizes = (1000, 10000), repeats = 3, stages = None, cases = None, directory = None):
+	"""
+	Measure the selected cases (all of them by default) for each size, every one in a fresh process; returns a list of dicts.
+	"""
+	selected = [key for key in CASES if (stages is None or key[0] in stages) and (cases is None or key[1] in cases)]
+	context = multiprocessing.get_context('spawn')
+
+	results = []
+	for stage, case in selected:
+		for size in sizes:
+			with ProcessPoolExecutor(max_workers = 1, mp_context = context) as executor:
+				result = executor.submit(measure, stage, case, size, repeats, directory).result()
+			print('{stage:>12} {case:>18} {size:>8}: {windows_per_s:12.0f} windows/s, best {best_s:.4f} s'.format(**result), flush = True)
+			results.append(result)
+	return results
+
+def environment():
+	"""
+	The versions and machine the benchmarks ran on, recorded along with the results.
+	"""
+	return {
+		'python': platform.python_version(), 'numpy': np.__version__, 'scipy': scipy.__version__, 'pandas': pd.__version__,
+		'platform': platform.platform(), 'processor': platform.processor(), 'cpu_count': os.cpu_count(),
+		'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+	}
+
+def compare(results, baseline):
+	"""
+	Compare results to the ones of a former run; returns a pd.DataFrame of the cases both hold, with the speedup of the current run.
+	"""
+	key = ['stage', 'case', 'size']
+	merged = pd.DataFrame(baseline).merge(pd.DataFrame(results), on = key, suffixes = ('_baseline', ''))
+	merged['speedup'] = merged['best_s_baseline'] / merged['best_s']
+	merged['rss_ratio'] = merged['peak_rss_mb'] / merged['peak_rss_mb_baseline']
+	return merged[key + ['best_s_baseline', 'best_s', 'speedup', 'peak_rss_mb_baseline', 'peak_rss_mb', 'rss_ratio']]
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description = __doc__.strip().splitlines()[0])
+	parser.add_argument('--sizes', type = int, nargs = '+', default = [1000, 10000], help = 'numbers of windows (of %d samples) per case' % WIN_LEN)
+	parser.add_argument('--repeats', type = int, default = 3, help = 'number of timed runs per case, after a warm-up one')
+	parser.add_argument('--stages', nargs = '+', choices = sorted({stage for stage, _ in CASES}), help = 'stages to run; all by default')
+	parser.add_argument('--cases', nargs = '+', choices = sorted({case for _, case in CASES}), help = 'cases to run; all by default')
+	parser.add_argument('--directory', help = 'where the fixtures are written; the temporary directory by default')
+	parser.add_argument('--output', help = 'path of a JSON file to write the results to')
+	parser.add_argument('--compare', help = 'path of the JSON file of a former run, to compare the results to')
+	args = parser.parse_args()
+
+	results = run(args.sizes, args.repeats, args.stages, args.cases, args.directory)
+	table = pd.DataFrame(results)
+	print(table[['stage', 'case', 'size', 'windows', 'windows_per_s', 'best_s', 'median_s', 'peak_rss_mb']].to_string(index = False, float_format = '%.3f'))
+
+	if args.output:
+		with open(args.output, 'w') as f:
+			json.dump({'environment': environment(), 'parameters': {'win_len': WIN_LEN, 'hop_len': HOP_LEN, 'repeats': args.repeats}, 'results': results}, f, indent = 2)
+	if args.compare:
+		with open(args.compare, 'r') as f:
+			baseline = json.load(f)['results']
+		print(compare(results, baseline).to_string(index = False, float_format = '%.3f'))
@@ -1,8 +1,33 @@
+import inspect
 import numpy as np
 import pandas as pd
 from scipy.signal import resample
+from damavand.damavand.datasets.banks import SignalBank
 
-def gaussian_noise(signals, SNR_level, return_noise = False):
+def _random(rng):
+  """
+  The source of randomness of the augmentations: the given np.random.Generator, or the global np.random state if None.
+  """
+  return np.random if rng is None else rng
+
+def _values(signals, dtype = None):
+  """
+  The signals as a floating point np.array() of the given dtype; defaults to the dtype of the signals if floating, float64 otherwise.
+  """
+  values = np.asarray(signals, dtype = dtype)
+  if not np.issubdtype(values.dtype, np.floating):
+    values = values.astype(float)
+  return values
+
+def _standard_normal(rng, shape, dtype):
+  """
+  Standard normal samples of the given floating point dtype; a np.random.Generator draws single precision samples directly.
+  """
+  if rng is not None and np.dtype(dtype) in (np.float32, np.float64):
+    return rng.standard_normal(shape, dtype = dtype)
+  return _random(rng).standard_normal(shape).astype(dtype, copy = False)
+
+def gaussian_noise(signals, SNR_level, return_noise = False, rng = None, dtype = None):
   
   """
   Adding Gaussian noise to a set of signals.
@@ -15,6 +40,10 @@ def gaussian_noise(signals, SNR_level, return_noise = False):
     The desired signal-to-noise ratio (in dB) of the augmented signals.
   return_noise: bool, optional
     Whether to return the pure noises as a secondary output; defaults to False.
+  rng: numpy.random.Generator, optional
+    The generator to draw the noises from (e.g. np.random.default_rng(seed)), for reproducible augmentations; defaults to the global np.random state.
+  dtype: numpy dtype, optional
+    The floating point dtype of the computation and of the outputs (e.g. np.float32); defaults to the dtype of the signals if floating, float64 otherwise.
 
   Returns
   -------
@@ -22,46 +51,26 @@ def gaussian_noise(signals, SNR_level, return_noise = False):
     A DataFrame whose rows are the augmented signals.
   noises: pandas.DataFrame, optional
     A DataFrame whose rows are the pure noises; only returned when return_noise is set to True.
-  """
-  
-  def noise_genaretor(row, SNR_level):
-    """
-    Generate Gaussian noise for a given signal row based on the desired SNR level.
-
-    Parameters
-    ----------
-    row : np.ndarray
-      The signal data for which noise is to be generated.
-    SNR_level : float
-      The desired signal-to-noise ratio in decibels.
-
-    Returns
-    -------
-    np.ndarray
-      An array of Gaussian noise with the same shape as the input signal row.
-    """
-
-    signal_power = np.sum(np.square(row))
-    noise_power = signal_power / np.power(10, (SNR_level/10))
-    noise = np.random.normal(0, np.sqrt(noise_power), row.shape)
-    
-    return noise
-  
-  noises = []
-  noisy_records = []
-  for index, row in signals.iterrows():
-    noise = noise_genaretor(row, SNR_level)
-    noises.append(noise)
-    noisy_records.append(row + noise)
 
+  Notes
+  -----
+  The power of every signal is computed at once, as a row-wise reduction, and the noises of all signals are drawn in a single call.
+  """
+  values = _values(signals, dtype)
+  # like the sums of pd.Series, missing (NaN) samples are skipped, so that they only leave their own sample missing
+  signal_power = np.nansum(np.square(values), axis = 1, keepdims = True)
+  noise_power = signal_power / np.power(10, (SNR_level/10))
+  noises = _standard_normal(rng, values.shape, values.dtype)
+  noises *= np.sqrt(noise_power)
 
+  noisy_signals = pd.DataFrame(values + noises, index = signals.index, columns = signals.columns)
   if return_noise:
-    return pd.DataFrame(noisy_records), pd.DataFrame(noises)
+    return noisy_signals, pd.DataFrame(noises)
   else:
-    return pd.DataFrame(noisy_records)
+    return noisy_signals
   
 
-def masking_noise(signals, ratio, uniformity = False, return_mask = False):
+def masking_noise(signals, ratio, uniformity = False, return_mask = False, rng = None, dtype = None):
   
   """
   Masking a given set of signals with a certain ratio of its elements zeroed out.
@@ -71,11 +80,15 @@ def masking_noise(signals, ratio, uniformity = False, return_mask = False):
   signals : pandas.DataFrame
     A DataFrame whose rows are the signals to be masked.
   ratio : float
-    A float in the range [0, 1) that determines the ratio of elements of each signal to be zeroed out.
+    A float in the range [0, 1] that determines the ratio of elements of each signal to be zeroed out.
   uniformity : bool, optional
     A boolean flag to determine whether to generate identical masks for all observations or not. Defaults to False.
   return_mask : bool, optional
     A boolean flag to determine whether to return the masks as well or not. Defaults to False.
+  rng : numpy.random.Generator, optional
+    The generator to draw the masks from (e.g. np.random.default_rng(seed)), for reproducible augmentations; defaults to the global np.random state.
+  dtype : numpy dtype, optional
+    The floating point dtype of the masked signals and of the masks (e.g. np.float32); defaults to the dtype of the signals if floating, float64 otherwise.
 
   Returns
   -------
@@ -83,34 +96,31 @@ def masking_noise(signals, ratio, uniformity = False, return_mask = False):
     A DataFrame including the augmented signals with the desired ratio of zeroed out elements.
   pandas.DataFrame, optional
     A DataFrame including the binary masks that have been used to zero out the elements of signals. Only returned if return_mask is set to True.
+
+  Notes
+  -----
+  The zeroed out elements of each signal are the ones with the smallest random keys; keys of all signals are drawn at once and selected with a single, row-wise np.argpartition().
   """
   
-  n_mask = int(signals.shape[1] * ratio)
+  values = _values(signals, dtype)
+  n_mask = int(values.shape[1] * ratio)
+  keys = _random(rng).random((1 if uniformity else values.shape[0], values.shape[1]))
+  masks = np.ones(keys.shape, dtype = values.dtype)
+  if n_mask:
+    np.put_along_axis(masks, np.argpartition(keys, n_mask - 1, axis = 1)[:, :n_mask], 0, axis = 1)
 
+  masked_signals = pd.DataFrame(values * masks)
   if uniformity:
-    mask = np.ones((signals.shape[1]))
-    indices = np.random.choice(np.arange(mask.shape[0]), replace = False, size = n_mask)
-    mask[indices] = 0
-
-    if return_mask:
-      return pd.DataFrame(signals.to_numpy() * mask), mask
-    else:
-      return pd.DataFrame(signals.to_numpy() * mask)
-  
+    masks = masks[0]
+  else:
+    masks = pd.DataFrame(masks)
+
+  if return_mask:
+    return masked_signals, masks
   else:
-    masks = []
-    for index, row in signals.iterrows():
-      mask = np.ones((row.shape[0]))
-      indices = np.random.choice(np.arange(mask.shape[0]), replace = False, size = n_mask)
-      mask[indices] = 0
-      masks.append(mask)
-
-    if return_mask:
-      return pd.DataFrame(signals.to_numpy() * masks), pd.DataFrame(masks)
-    else:
-      return pd.DataFrame(signals.to_numpy() * masks)
+    return masked_signals
     
-def amplitude_shifting(signals, coefficients):
+def amplitude_shifting(signals, coefficients, dtype = None):
   
   """
   Shift the amplitude of a set of signals by a set of coefficients
@@ -121,18 +131,22 @@ def amplitude_shifting(signals, coefficients):
     Signals to be rescaled
   coefficients : float or list of floats
     Coefficients to be multiplied to the signals. If a float, all signals will be rescaled with that coefficient. If a list of floats, each signal will be rescaled with the corresponding coefficient in the list
+  dtype : numpy dtype, optional
+    The dtype of the rescaled signals (e.g. np.float32); defaults to the dtype of the signals.
   
   Returns
   -------
   pd.DataFrame
     Rescaled signals
   """
+  if dtype is not None:
+    signals = signals.astype(dtype)
   if type(coefficients) == list :
-    coefficients = np.repeat(np.array(coefficients).reshape(-1, 1), signals.shape[1], axis = 1)
+    coefficients = np.repeat(np.array(coefficients, dtype = dtype).reshape(-1, 1), signals.shape[1], axis = 1)
   
   return signals * coefficients
 
-def resampling(signals, target_len):
+def resampling(signals, target_len, dtype = None):
   """
   Resample signals to a target length
 
@@ -142,10 +156,121 @@ def resampling(signals, target_len):
     Signals to be resampled
   target_len : int
     Target length of the resampled signals
+  dtype : numpy dtype, optional
+    The floating point dtype of the computation and of the resampled signals (e.g. np.float32); defaults to the dtype of the signals if floating, float64 otherwise.
 
   Returns
   -------
   pd.DataFrame
     Resampled signals
   """
-  return pd.DataFrame(resample(signals, target_len, axis = 1))
\ No newline at end of file
+  return pd.DataFrame(resample(_values(signals, dtype), target_len, axis = 1))
+
+class AugmentationPipeline:
+  
+  """
+  A composable chain of augmentations, applied lazily to batches of signals.
+
+  Parameters
+  ----------
+  transforms : list of tuple
+    The augmentations, in order of application; each one is a `(func, kwargs)` or `(func, kwargs, probability)` tuple, where `func` is an augmentation function (e.g. `gaussian_noise`) called as `func(signals, **kwargs)`, and `probability` (defaults to 1) is the chance of each signal being augmented by it. A value of `kwargs` may be a callable `value(rng, n_signals)`, drawn anew every time the augmentation is applied (e.g. `{'coefficients': lambda rng, n: list(rng.uniform(0.8, 1.2, n))}`).
+  copies : int, optional
+    Number of augmented copies generated from each batch by `flow()`. Defaults to 1.
+  include_original : bool, optional
+    Whether `flow()` yields each batch itself before its augmented copies. Defaults to False.
+  seed : int or numpy.random.Generator, optional
+    Seed of the generator that draws the augmented signals, the probabilities and the callable arguments; pipelines with equal seeds yield equal augmentations. Defaults to None (unpredictable).
+  dtype : numpy dtype, optional
+    The floating point dtype of the augmented signals (e.g. np.float32); defaults to the dtype of the batches if floating, float64 otherwise.
+
+  Notes
+  -----
+  Augmentations accepting an `rng` argument draw from the generator of the pipeline. Augmentations changing the length of the signals (e.g. `resampling`) must have a probability of 1.
+  """
+
+  def __init__(self, transforms, copies = 1, include_original = False, seed = None, dtype = None):
+    self.transforms = []
+    for transform in transforms:
+      func, kwargs, probability = (tuple(transform) + (1,))[:3]
+      if not 0 <= probability <= 1:
+        raise ValueError(f'The probability of {func.__name__} must be in [0, 1], got {probability}.')
+      self.transforms.append((func, dict(kwargs or {}), probability, 'rng' in inspect.signature(func).parameters))
+
+    self.copies = copies
+    self.include_original = include_original
+    self.seed = seed
+    self.dtype = dtype
+    self.rng = np.random.default_rng(seed)
+
+  def reset(self):
+    """
+    Re-seed the pipeline, so that it yields the same augmentations again; only meaningful if seeded with an int.
+    """
+    self.rng = np.random.default_rng(self.seed)
+
+  def _augment(self, values):
+    for func, kwargs, probability, takes_rng in self.transforms:
+      rows = np.flatnonzero(self.rng.random(len(values)) < probability) if probability < 1 else slice(None)
+      n_signals = len(values) if isinstance(rows, slice) else len(rows)
+      if n_signals == 0:
+        continue
+
+      arguments = {key: value(self.rng, n_signals) if callable(value) else value for key, value in kwargs.items()}
+      if takes_rng:
+        arguments['rng'] = self.rng
+      augmented = np.asarray(func(pd.DataFrame(values[rows]), **arguments))
+
+      if augmented.shape[1] != values.shape[1]:
+        if not isinstance(rows, slice):
+          raise ValueError(f'{func.__name__} changes the length of the signals, so its probability must be 1.')
+        values = augmented.astype(values.dtype, copy = False)
+      else:
+        values[rows] = augmented
+
+    return values
+
+  def __call__(self, signals):
+    """
+    Augment a batch of signals.
+
+    Parameters
+    ----------
+    signals : pandas.DataFrame, numpy.ndarray or SignalBank
+      A batch whose rows are the signals to be augmented.
+
+    Returns
+    -------
+    pandas.DataFrame, numpy.ndarray or SignalBank
+      The augmented batch, of the same type as `signals`; the index (and columns, if the length of the signals is unchanged) of a DataFrame, and the metadata of a SignalBank, are kept.
+    """
+    values = np.array(_values(signals.signals if isinstance(signals, SignalBank) else signals, self.dtype))
+    values = self._augment(values)
+
+    if isinstance(signals, SignalBank):
+      return SignalBank(values, signals.metadata)
+    if isinstance(signals, pd.DataFrame):
+      return pd.DataFrame(values, index = signals.index, columns = signals.columns if values.shape[1] == signals.shape[1] else None)
+    return values
+
+  def flow(self, batches):
+    """
+    Lazily augment a stream of batches, e.g. the output of a digestor's `iter_mine()`.
+
+    Parameters
+    ----------
+    batches : iterable
+      An iterable of batches (see `__call__`), or of `(key, batch)` tuples.
+
+    Yields
+    ------
+    The augmented copies of each batch (preceded by the batch itself if `include_original` is set), in the form of the items of `batches`; only one batch and one of its copies are held in memory at a time.
+    """
+    for batch in batches:
+      keyed = isinstance(batch, tuple)
+      key, batch = batch if keyed else (None, batch)
+      if self.include_original:
+        yield (key, batch) if keyed else batch
+      for _ in range(self.copies):
+        augmented = self(batch)
+        yield (key, augmented) if keyed else augmented
\ No newline at end of file
@@ -0,0 +1,231 @@
+import atexit
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from zipfile import ZipFile
+from rarfile import RarFile
+
+ARCHIVE_EXTENSIONS = ('.zip', '.rar')
+
+_index_cache = {}
+_archive_cache = {}
+_lock = threading.Lock()
+
+
+def _close_archives():
+	"""
+	Close the cached archive handles; called at exit and, in forked children, so that they never read through the file offsets of their parent.
+	"""
+	global _lock
+	_lock = threading.Lock()
+	for archive, _, _ in _archive_cache.values():
+		archive.close()
+	_archive_cache.clear()
+
+atexit.register(_close_archives)
+if hasattr(os, 'register_at_fork'):
+	os.register_at_fork(after_in_child = _close_archives)
+
+
+def open_archive(path):
+	"""
+	Open a .zip or .rar archive, as a ZipFile or RarFile object.
+	"""
+	return RarFile(path) if path.lower().endswith('.rar') else ZipFile(path, 'r')
+
+def select_members(names, members = None):
+	"""
+	Select the member names of an archive.
+
+	Parameters
+	----------
+	names : list of str
+		The member names of the archive.
+	members : callable or list of str, optional
+		Either a predicate of the member names, or a list of shell-style patterns (see fnmatch), such as `'K001/*_1.mat'`; a member is selected if it matches any of them. If None (default), all members are selected.
+
+	Returns
+	-------
+	list of str
+		The selected member names, in the order of `names`.
+	"""
+	if members is None:
+		return list(names)
+	if callable(members):
+		return [name for name in names if members(name)]
+	if isinstance(members, str):
+		members = [members]
+	return [name for name in names if any(fnmatch(name, pattern) for pattern in members)]
+
+def extract_archive(path, extraction_path, members = None):
+	"""
+	Extract the (selected) members of an archive.
+
+	Parameters
+	----------
+	path : str
+		Path of the .zip or .rar archive.
+	extraction_path : str
+		The directory path where the members will be extracted.
+	members : callable or list of str, optional
+		The members to extract (see `select_members`); all of them if None (default).
+
+	Returns
+	-------
+	list of str
+		The names of the extracted members.
+	"""
+	with open_archive(path) as archive:
+		names = select_members(archive.namelist(), members)
+		archive.extractall(extraction_path, members = names)
+	return names
+
+def extract_archives(paths, extraction_path, members = None, n_workers = 4):
+	"""
+	Extract the (selected) members of several archives concurrently.
+
+	Parameters
+	----------
+	paths : list of str
+		Paths of the .zip or .rar archives.
+	extraction_path : str
+		The directory path where the members will be extracted.
+	members : callable or list of str, optional
+		The members to extract from each archive (see `select_members`); all of them if None (default).
+	n_workers : int, optional
+		Number of archives extracted at the same time. Default is 4.
+
+	Returns
+	-------
+	dict
+		A dictionary whose keys are the archive paths and values are the names of their extracted members.
+	"""
+	def extract(path):
+		print('Extracting: ', os.path.basename(path))
+		return extract_archive(path, extraction_path, members)
+
+	with ThreadPoolExecutor(max_workers = n_workers) as executor:
+		return dict(zip(paths, executor.map(extract, paths)))
+
+def _index(directory):
+	"""
+	Map the member names of every archive stored in `directory` to the path of their archive.
+	"""
+	mtime_ns = os.stat(directory).st_mtime_ns
+	with _lock:
+		cached = _index_cache.get(directory)
+		if cached is not None and cached[0] == mtime_ns:
+			return cached[1]
+
+	index = {}
+	for file in sorted(os.listdir(directory)):
+		path = os.path.join(directory, file)
+		if file.lower().endswith(ARCHIVE_EXTENSIONS) and os.path.isfile(path):
+			with open_archive(path) as archive:
+				for name in archive.namelist():
+					index.setdefault(name.rstrip('/'), path)
+
+	with _lock:
+		_index_cache[directory] = (mtime_ns, index)
+	return index
+
+def _locate(path):
+	"""
+	Locate a path that does not exist on disk inside archives, as a `(container, member)` tuple, or None.
+
+	The path may either be or go through an archive (e.g. `'UoO.zip/H_1.csv'`), or through a directory holding archives whose members make up the rest of the path (e.g. `'PU/K001/N15_M07_F10_K001_1.mat'`,
+	with `K001/N15_M07_F10_K001_1.mat` stored in `PU/K001.rar`); `container` is the archive or the directory, respectively.
+	"""
+	parts = os.path.normpath(path).split(os.sep)
+	for i in range(len(parts), 0, -1):
+		prefix = os.sep.join(parts[:i]) or os.sep
+		if (os.path.isdir(prefix) and i < len(parts)) or (os.path.isfile(prefix) and prefix.lower().endswith(ARCHIVE_EXTENSIONS)):
+			return prefix, '/'.join(parts[i:])
+	return None
+
+def _archive(path):
+	"""
+	A cached `(archive, lock)` handle of an archive; the handle of a modified archive is closed and replaced.
+	"""
+	mtime_ns = os.stat(path).st_mtime_ns
+	with _lock:
+		cached = _archive_cache.get(path)
+		if cached is None or cached[1] != mtime_ns:
+			if cached is not None:
+				with cached[2]:
+					cached[0].close()
+			cached = _archive_cache[path] = (open_archive(path), mtime_ns, threading.Lock())
+		return cached[0], cached[2]
+
+def _names(container):
+	if os.path.isdir(container):
+		return _index(container).keys()
+	archive, lock = _archive(container)
+	with lock:
+		return [name.rstrip('/') for name in archive.namelist()]
+
+def listdir(path):
+	"""
+	os.listdir() that also lists the directories of archives (see `_locate`), for datasets read without extracting them.
+	"""
+	if os.path.isdir(path):
+		return os.listdir(path)
+
+	located = _locate(path)
+	prefix = located[1] + '/' if located is not None and located[1] else ''
+	entries = [name[len(prefix):].split('/')[0] for name in _names(located[0]) if name.startswith(prefix)] if located is not None else []
+	if not entries:
+		raise FileNotFoundError(f'No such directory, nor archived directory: {path!r}')
+	return list(dict.fromkeys(entries))
+
+def _member(path):
+	located = _locate(path)
+	if located is not None and os.path.isdir(located[0]):
+		located = (_index(located[0]).get(located[1]), located[1])
+	if located is None or located[0] is None:
+		raise FileNotFoundError(f'No such file, nor archived file: {path!r}')
+	return located
+
+def source(path):
+	"""
+	The path itself if it exists on disk, else an in-memory file object holding the archive member it points to (see `_locate`); the result can be passed to scipy.io.loadmat() or pd.read_csv().
+	"""
+	if os.path.exists(path):
+		return path
+
+	archive_path, member = _member(path)
+	archive, lock = _archive(archive_path)
+	with lock:
+		return io.BytesIO(archive.read(member))
+
+def file_stat(path):
+	"""
+	The size and modification time (in ns) of a file, or of the archive holding it; used to fingerprint the files of the mining cache.
+	"""
+	stat = os.stat(path if os.path.exists(path) else _member(path)[0])
+	return stat.st_size, stat.st_mtime_ns
+
+def file_size(path):
+	"""
+	The size of a file, or the uncompressed size of the archive member it points to (see `_locate`).
+	"""
+	if os.path.exists(path):
+		return os.path.getsize(path)
+
+	archive_path, member = _member(path)
+	archive, lock = _archive(archive_path)
+	with lock:
+		return archive.getinfo(member).file_size
+
+def listing_stamp(path):
+	"""
+	The modification time (in ns) of what `listdir(path)` lists: the directory itself, or the archive or directory of archives holding it; used to tell when a listing may have changed.
+	"""
+	if os.path.isdir(path):
+		return os.stat(path).st_mtime_ns
+	located = _locate(path)
+	if located is None:
+		raise FileNotFoundError(f'No such directory, nor archived directory: {path!r}')
+	return os.stat(located[0]).st_mtime_ns
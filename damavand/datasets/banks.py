@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+class SignalBank:
+	def __init__(self, signals, metadata):
+		"""
+		A bank of equal-length signals with their metadata.
+
+		Parameters
+		----------
+		signals : np.ndarray
+			A 2-D array whose rows are the signals.
+		metadata : pd.DataFrame
+			A DataFrame with one row per signal; its columns are stored as categoricals, so that repeated labels (e.g. `state` or `severity`) cost a small integer code per signal.
+
+		Attributes
+		----------
+		signals : np.ndarray
+			A contiguous 2-D array whose rows are the signals. The blocks of the banks built by `from_blocks()` or `concat()` are only joined into it when it is first
+			accessed, so that blocks memory-mapped from the cache of the digestors (see `mine()`) are not copied before then.
+		metadata : pd.DataFrame
+			The categorical-encoded metadata of the signals, indexed from 0 to `len(self) - 1`.
+		"""
+		if signals.shape[0] != len(metadata):
+			raise ValueError(f'Got {signals.shape[0]} signals but {len(metadata)} metadata rows.')
+
+		self._blocks = None
+		self.signals = signals
+		self.metadata = metadata.astype('category').reset_index(drop = True)
+
+	@classmethod
+	def _joined(cls, blocks, metadata, dtype):
+		# a bank whose signals are the given blocks, joined (and cast to dtype) on first access
+		bank = cls.__new__(cls)
+		bank._blocks, bank._dtype = blocks, np.dtype(dtype)
+		bank._length = sum(len(block) for block in blocks)
+		bank.metadata = metadata.astype('category').reset_index(drop = True)
+		return bank
+
+	@property
+	def signals(self):
+		if self._blocks is not None:
+			blocks, dtype, self._blocks = self._blocks, self._dtype, None
+			if len(blocks) == 1:
+				self._signals = np.asarray(blocks[0], dtype = dtype)
+			else:
+				self._signals = np.concatenate(blocks, dtype = dtype, casting = 'unsafe')
+		return self._signals
+
+	@signals.setter
+	def signals(self, signals):
+		self._blocks = None
+		self._signals = signals
+		self._length = signals.shape[0]
+
+	@classmethod
+	def from_blocks(cls, blocks, dtype = None):
+		"""
+		Build a bank from blocks of windows sharing the same metadata, e.g. the windows mined from each file of a dataset.
+
+		Parameters
+		----------
+		blocks : list of tuple
+			A list of `(windows, metadata)` tuples, where `windows` is a 2-D np.ndarray and `metadata` is a dict of the labels shared by all of its rows.
+		dtype : numpy dtype, optional
+			The dtype of the signals; defaults to the common dtype of the blocks.
+
+		Returns
+		-------
+		SignalBank
+			A bank whose signals are copied once into a single contiguous array, when they are first accessed; a single block of the same dtype is not copied at all.
+		"""
+		if not blocks:
+			return cls(np.empty((0, 0), dtype = dtype), pd.DataFrame())
+
+		counts = [len(windows) for windows, _ in blocks]
+		dtype = dtype if dtype is not None else np.result_type(*[windows.dtype for windows, _ in blocks])
+
+		columns = list(dict.fromkeys(column for _, metadata in blocks for column in metadata))
+		metadata = {}
+		for column in columns:
+			labels = pd.Categorical([block_metadata.get(column) for _, block_metadata in blocks])
+			metadata[column] = pd.Categorical.from_codes(np.repeat(labels.codes, counts), labels.categories)
+
+		return cls._joined([windows for windows, _ in blocks], pd.DataFrame(metadata, index = pd.RangeIndex(sum(counts))), dtype)
+
+	@classmethod
+	def from_frame(cls, df):
+		"""
+		Build a bank from a pd.DataFrame whose integer-labelled columns are the signal samples and other columns are the metadata (the layout of the DataFrames of the digestors, and of `to_frame()`).
+		"""
+		samples = [column for column in df.columns if isinstance(column, (int, np.integer))]
+		return cls(df[samples].to_numpy(), df.drop(columns = samples))
+
+	@classmethod
+	def concat(cls, banks):
+		"""
+		Concatenate banks of signals of the same length.
+
+		Parameters
+		----------
+		banks : list of SignalBank
+			The banks to concatenate, in order.
+
+		Returns
+		-------
+		SignalBank
+			A bank holding the signals of all `banks`.
+		"""
+		banks = [bank for bank in banks if len(bank)]
+		if not banks:
+			return cls(np.empty((0, 0)), pd.DataFrame())
+
+		columns = list(dict.fromkeys(column for bank in banks for column in bank.metadata.columns))
+		metadata = {}
+		for column in columns:
+			categories = next(bank.metadata[column].cat.categories for bank in banks if column in bank.metadata)
+			parts = [
+				bank.metadata[column] if column in bank.metadata else pd.Categorical.from_codes(np.full(len(bank), -1), categories)
+				for bank in banks
+			]
+			metadata[column] = union_categoricals(parts, ignore_order = True)
+
+		blocks = [block for bank in banks for block in (bank._blocks if bank._blocks is not None else [bank.signals])]
+		dtype = np.result_type(*[bank._dtype if bank._blocks is not None else bank.signals.dtype for bank in banks])
+		return cls._joined(blocks, pd.DataFrame(metadata, index = pd.RangeIndex(sum(len(bank) for bank in banks))), dtype)
+
+	def __len__(self):
+		return self._length
+
+	def __getitem__(self, rows):
+		"""
+		Select signals by position, slice or boolean mask; returns a new SignalBank, of a single signal for a scalar position.
+		"""
+		if isinstance(rows, slice):
+			return SignalBank(self.signals[rows], self.metadata.iloc[rows])
+		rows = np.asarray(rows)
+		if rows.ndim == 0:
+			if rows.dtype == bool or not np.issubdtype(rows.dtype, np.integer):
+				raise TypeError(f'SignalBank indices must be integers, slices or boolean masks, not {rows.dtype}.')
+			rows = rows.reshape(1)
+		return SignalBank(self.signals[rows], self.metadata.iloc[np.flatnonzero(rows) if rows.dtype == bool else rows])
+
+	def mask(self, conditions = None, **kwargs):
+		"""
+		Boolean mask of the signals whose metadata satisfy all of the given conditions.
+
+		Parameters
+		----------
+		conditions : dict, optional
+			A dictionary whose keys are metadata columns and values are either a single label or a list/tuple/set of accepted labels.
+		**kwargs
+			Further conditions, given as keyword arguments (e.g. `state = ['IR', 'OR'], fs = '12K'`).
+
+		Returns
+		-------
+		np.ndarray
+			A boolean array with one element per signal.
+		"""
+		mask = np.ones(len(self), dtype = bool)
+		for column, accepted in {**(conditions or {}), **kwargs}.items():
+			if not isinstance(accepted, (list, tuple, set, frozenset)):
+				accepted = [accepted]
+			mask &= self.metadata[column].isin(list(accepted)).to_numpy()
+		return mask
+
+	def filter(self, conditions = None, **kwargs):
+		"""
+		Select the signals whose metadata satisfy all of the given conditions (see `mask`); returns a new SignalBank.
+		"""
+		return self[self.mask(conditions, **kwargs)]
+
+	def to_frame(self):
+		"""
+		Convert the bank into a single pd.DataFrame, whose first columns are the signal samples and last columns are the metadata (the layout of the concatenated DataFrames of the digestors).
+		"""
+		df = pd.DataFrame(self.signals)
+		for column in self.metadata.columns:
+			df[column] = self.metadata[column].to_numpy()
+		return df
@@ -2,10 +2,715 @@ import numpy as np
 import pandas as pd
 import os
 import scipy.io as sio
-import gc
+import json
+import hashlib
+import inspect
+import shutil
+import tempfile
+import threading
+import time
+import heapq
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from damavand.damavand.utils import *
+from damavand.damavand.datasets.banks import SignalBank
+from damavand.damavand.datasets.archives import listdir as _listdir, listing_stamp, source, file_stat, file_size
 
-class KAIST:
+
+def _h5py():
+	try:
+		import h5py
+	except ImportError as e:
+		raise ImportError('Reading MATLAB v7.3 (HDF5) .mat files requires h5py; install it with `pip install h5py`.') from e
+	return h5py
+
+def _rewind(file):
+	if hasattr(file, 'seek'):
+		file.seek(0)
+
+def _mat_names(file):
+	"""
+	Names of the variables of a .mat file (a path or a file object), read from their headers only.
+	"""
+	try:
+		names = [name for name, _, _ in sio.whosmat(file)]
+	except NotImplementedError:
+		# MATLAB v7.3 files are HDF5 files
+		_rewind(file)
+		with _h5py().File(file, 'r') as f:
+			names = [name for name in f.keys() if not name.startswith('#')]
+	_rewind(file)
+	return names
+
+def _mat_variables(file, names):
+	"""
+	Load only the given numeric variables of a .mat file (a path or a file object), as a dict of np.ndarrays; MATLAB v7.3 (HDF5) files are read with h5py, one dataset at a time.
+	"""
+	try:
+		return sio.loadmat(file, variable_names = names)
+	except NotImplementedError:
+		_rewind(file)
+		with _h5py().File(file, 'r') as f:
+			# HDF5 stores MATLAB's column-major arrays transposed
+			return {name: f[name][()].T for name in names if name in f}
+
+def _read_kaist(path, channels):
+	mat_contents = sio.loadmat(source(path), variable_names = ['Signal'])
+	signals = mat_contents['Signal'][0][0][1][0][0][0]
+	return {key: signals[:, key] for key in channels}, {}
+
+def _read_mfpt(path):
+	bearing_data = sio.loadmat(source(path), variable_names = ['bearing'])['bearing'][0][0]
+	file = os.path.basename(path)
+	if file.startswith('baseline'):
+		Fs, load, rot_speed, signal = bearing_data[0][0][0], bearing_data[2][0][0], bearing_data[3][0][0], bearing_data[1]
+		state = 'Normal'
+	elif file.startswith('OuterRaceFault'):
+		Fs, load, rot_speed, signal = bearing_data[3][0][0], bearing_data[1][0][0], bearing_data[0][0][0], bearing_data[2]
+		state = 'OR'
+	else:
+		Fs, load, rot_speed, signal = bearing_data[3][0][0], bearing_data[1][0][0], bearing_data[0][0][0], bearing_data[2]
+		state = 'IR'
+
+	return {'bearing': signal.reshape(-1)}, {'Fs': Fs, 'load': load, 'rot_speed': rot_speed, 'state': state}
+
+def _read_cwru(path, channels, synchronous_only):
+	file = source(path)
+	available_channels = {key.split('_')[1]: key for key in _mat_names(file) if key.split('_')[-1] == 'time'}
+	if synchronous_only and not set(available_channels.keys()) >= set(channels):
+		return {}, {}
+
+	mat_data = _mat_variables(file, [available_channels[channel] for channel in channels if channel in available_channels.keys()])
+	return {channel: mat_data[available_channels[channel]].reshape(-1) for channel in channels if channel in available_channels.keys()}, {}
+
+def _read_numeric_csv(path, channels, delimiter = ',', skiprows = 0, header = None, encoding = None):
+	"""
+	Parse only the `channels` columns (by position) of a numeric delimited file, with pandas' C parser and an explicit float64 dtype.
+	"""
+	columns = sorted(set(channels))
+	df = pd.read_csv(
+		source(path), sep = delimiter, header = header, skiprows = skiprows, usecols = columns, dtype = np.float64,
+		engine = 'c', encoding = encoding, encoding_errors = 'ignore'
+	)
+	arr = df.to_numpy()
+	return {key: arr[:, columns.index(key)] for key in channels}, {}
+
+def _read_seu(path, channels, delimiter):
+	signals, metadata = _read_numeric_csv(path, channels, delimiter = delimiter, skiprows = 16, encoding = 'gb18030')
+	print('Mining: ', os.path.basename(path))
+	return signals, metadata
+
+def _read_mat_variables(path, channels):
+	mat_data = _mat_variables(source(path), channels)
+	return {channel: mat_data[channel].reshape((-1)) for channel in channels}, {}
+
+def _read_pu(path, channels):
+	name = os.path.basename(path).split('.')[0]
+	measurements = sio.loadmat(source(path), variable_names = [name])[name]['Y'][0][0][0]
+	positions = {'CP1': 1, 'CP2': 2, 'Vib': 6}
+	return {channel: measurements[positions[channel]][2].reshape((-1)) for channel in positions if channel in channels}, {}
+
+_listings = threading.local()
+
+def listdir(path):
+	"""
+	`archives.listdir()`, recording the modification time of the listed path while the tasks of a digestor are listed (see `_Digestor._listed`).
+	"""
+	stamps = getattr(_listings, 'stamps', None)
+	if stamps is not None:
+		stamps.setdefault(path, listing_stamp(path))
+	return _listdir(path)
+
+def _unchanged(stamps):
+	try:
+		return all(listing_stamp(path) == stamp for path, stamp in stamps.items())
+	except OSError:
+		return False
+
+def _json_default(obj):
+	if isinstance(obj, np.ndarray):
+		return obj.tolist()
+	if isinstance(obj, np.generic):
+		return obj.item()
+	raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+def _file_source(path):
+	size, mtime_ns = file_stat(path)
+	return {'path': os.path.abspath(path), 'size': size, 'mtime_ns': mtime_ns}
+
+def _cache_entry(cache_dir, task, mining_params, params_key, dtype = None):
+	"""
+	Path of the cache entry of a task, in the directory of the entries of its file; it changes whenever the file (path, size or modification time), the reader arguments,
+	the mining parameters or the dtype change.
+	"""
+	reader, path, metadata, reader_kwargs = task
+	file = _file_source(path)
+	fingerprint = json.dumps(
+		[reader.__name__, file['path'], file['size'], file['mtime_ns'], metadata, reader_kwargs, mining_params, params_key] + ([np.dtype(dtype).str] if dtype is not None else []),
+		sort_keys = True, default = _json_default
+	)
+	return os.path.join(cache_dir, hashlib.sha1(file['path'].encode()).hexdigest(), hashlib.sha1(fingerprint.encode()).hexdigest())
+
+def _load_cached(entry):
+	"""
+	The metadata and windows of a cache entry; windows are memory-mapped copy-on-write, so that they are only read, and shared with other processes, as pages are
+	accessed, while writes stay private to the process (the entry is never modified).
+	"""
+	with open(os.path.join(entry, 'metadata.json'), 'r') as f:
+		cached = json.load(f)
+	windows = {channel: np.load(os.path.join(entry, f'{i}.npy'), mmap_mode = 'c') for i, channel in enumerate(cached['channels'])}
+	return cached['metadata'], windows
+
+def _save_cached(entry, metadata, windows, file = None):
+	os.makedirs(os.path.dirname(entry), exist_ok = True)
+	temp_entry = tempfile.mkdtemp(dir = os.path.dirname(entry))
+	for i, channel_windows in enumerate(windows.values()):
+		np.save(os.path.join(temp_entry, f'{i}.npy'), channel_windows)
+	with open(os.path.join(temp_entry, 'metadata.json'), 'w') as f:
+		json.dump({'channels': list(windows.keys()), 'metadata': metadata, 'file': file}, f, default = _json_default)
+
+	try:
+		os.rename(temp_entry, entry)
+	except OSError:
+		# another worker has cached the same file meanwhile
+		shutil.rmtree(temp_entry, ignore_errors = True)
+
+def _stale_entries(file_dir, current = None):
+	"""
+	The entries of a directory of cache entries of a single file (see `_cache_entry`) that were mined from another version of the file, or from a removed file;
+	`current` is the current size and modification time of the file, if known.
+	"""
+	stale = []
+	for name in os.listdir(file_dir):
+		try:
+			with open(os.path.join(file_dir, name, 'metadata.json'), 'r') as f:
+				file = json.load(f).get('file')
+		except (OSError, ValueError):
+			# an entry being written, or not a cache entry
+			continue
+		if file is None:
+			continue
+		if current is None:
+			try:
+				current = _file_source(file['path'])
+			except OSError:
+				current = {}
+		if (file['size'], file['mtime_ns']) != (current.get('size'), current.get('mtime_ns')):
+			stale.append(os.path.join(file_dir, name))
+	return stale
+
+def prune_cache(cache_dir):
+	"""
+	Remove the entries of a mining cache (see the `cache_dir` parameter of `mine()`) whose files have changed or been removed since they were mined.
+
+	Entries of a file are pruned whenever it is mined again after it changed; this function also prunes the entries of files that were not mined again, e.g. removed
+	ones. Entries of other mining parameters, channels or dtypes of unchanged files are kept.
+
+	Parameters
+	----------
+	cache_dir : str
+		The cache directory.
+
+	Returns
+	-------
+	list of str
+		The removed entries.
+	"""
+	removed = []
+	for name in os.listdir(cache_dir):
+		file_dir = os.path.join(cache_dir, name)
+		if not os.path.isdir(file_dir):
+			continue
+		for entry in _stale_entries(file_dir):
+			shutil.rmtree(entry, ignore_errors = True)
+			removed.append(entry)
+		if not os.listdir(file_dir):
+			os.rmdir(file_dir)
+	return removed
+
+def _mine_file(task, mining_params, params_key = None, tolerant = False, cache_dir = None, dtype = None):
+	"""
+	Load a single file of a dataset and split its signals into windows.
+
+	Parameters
+	----------
+	task : tuple
+		A `(reader, path, metadata, reader_kwargs)` tuple; `reader(path, **reader_kwargs)` returns a dict of 1-D signals keyed by channel and a dict of metadata read from the file.
+	mining_params : dict
+		The mining parameters, as passed to `mine()`; besides `win_len` and `hop_len`, the optional `freq_filter` and `zero_phase` keys are passed to `splitter`.
+	params_key : str, optional
+		If given, the windowing parameters are `mining_params[metadata[params_key]]` (e.g. per sampling frequency) rather than `mining_params` itself.
+	tolerant : bool, optional
+		Whether to return the raised exception instead of propagating it. Default is False.
+	cache_dir : str, optional
+		If given, the windows are read from (memory-mapped) or written to a cache entry in this directory.
+	dtype : numpy dtype, optional
+		The dtype of the windows (see `splitter`); defaults to that of the signals read from the file.
+
+	Returns
+	-------
+	tuple or Exception
+		A `(metadata, windows)` tuple, where `windows` maps each channel to a 2-D np.ndarray of windows.
+	"""
+	reader, path, metadata, reader_kwargs = task
+	try:
+		if cache_dir is not None:
+			file = _file_source(path)
+			entry = _cache_entry(cache_dir, task, mining_params, params_key, dtype)
+			if os.path.isdir(entry):
+				return _load_cached(entry)
+
+		signals, file_metadata = reader(path, **reader_kwargs)
+		metadata = {**metadata, **file_metadata}
+		params = mining_params[metadata[params_key]] if params_key is not None else mining_params
+		windows = {
+			channel: splitter(signal, params['win_len'], params['hop_len'], return_df = False, dtype = dtype, freq_filter = params.get('freq_filter'), zero_phase = params.get('zero_phase', False))
+			for channel, signal in signals.items()
+		}
+
+		if cache_dir is not None:
+			_save_cached(entry, metadata, windows, file)
+			# the entries of former versions of the file are never hit again
+			for stale in _stale_entries(os.path.dirname(entry), file):
+				shutil.rmtree(stale, ignore_errors = True)
+	except Exception as e:
+		if not tolerant:
+			raise
+		return e
+
+	return metadata, windows
+
+def _map_tasks(func, tasks, n_workers = None, executor = None):
+	"""
+	Lazily apply `func` to `tasks`, serially or on an executor, yielding the results in the order of `tasks`.
+
+	At most `2 * n_workers` tasks (`2 * os.cpu_count()` if `n_workers` is None) are in flight at once, so that results waiting to be consumed stay bounded.
+	"""
+	if executor is None and (n_workers is None or n_workers <= 1):
+		for task in tasks:
+			yield func(task)
+		return
+
+	with nullcontext(executor) if executor is not None else ProcessPoolExecutor(max_workers = n_workers) as pool:
+		in_flight = deque()
+		for task in tasks:
+			in_flight.append(pool.submit(func, task))
+			if len(in_flight) >= 2 * (n_workers or os.cpu_count() or 1):
+				yield in_flight.popleft().result()
+		while in_flight:
+			yield in_flight.popleft().result()
+
+def _unbank_slots(data, as_bank = False):
+	"""
+	Turn the SignalBank slots of a digestor's data back into lists, to append the results of another mining to; unless `as_bank` is True, banks are converted into
+	pd.DataFrame objects, like the ones of a mining with `as_bank = False`.
+	"""
+	if isinstance(data, dict):
+		return {key: _unbank_slots(value, as_bank) for key, value in data.items()}
+	if isinstance(data, SignalBank):
+		return [data if as_bank else data.to_frame()]
+	return data
+
+def _bank_slots(data):
+	"""
+	Turn the `(windows, metadata)` blocks stored in each slot of a digestor's data into a single SignalBank per slot, along with the banks and pd.DataFrame objects of former minings.
+	"""
+	if isinstance(data, dict):
+		return {key: _bank_slots(value) for key, value in data.items()}
+	banks, blocks = [], []
+	for item in data:
+		if isinstance(item, tuple):
+			blocks.append(item)
+			continue
+		if blocks:
+			banks.append(SignalBank.from_blocks(blocks))
+			blocks = []
+		banks.append(item if isinstance(item, SignalBank) else SignalBank.from_frame(item))
+	if blocks or not banks:
+		banks.append(SignalBank.from_blocks(blocks))
+	return banks[0] if len(banks) == 1 else SignalBank.concat(banks)
+
+
+def _shard(sizes, paths, shard_index, num_shards):
+	"""
+	Positions of the files of the given shard, out of `num_shards` shards balanced by total file size.
+
+	Files are assigned largest first to the least loaded shard (ties are broken by path and by shard index), so that every node computes the same partition
+	from the same file listing, whatever the order in which its directories are listed.
+	"""
+	if not 0 <= shard_index < num_shards:
+		raise ValueError(f'shard_index must be in [0, {num_shards}), got {shard_index}.')
+
+	loads = [(0, shard) for shard in range(num_shards)]
+	selected = []
+	for position in sorted(range(len(paths)), key = lambda i: (-sizes[i], paths[i])):
+		load, shard = heapq.heappop(loads)
+		heapq.heappush(loads, (load + sizes[position], shard))
+		if shard == shard_index:
+			selected.append(position)
+	return sorted(selected)
+
+
+class _Digestor:
+	"""
+	Shared mining machinery of the digestors.
+
+	Subclasses describe each file to mine as a `(reader, path, metadata, reader_kwargs)` task (see `_mine_file`); files are then loaded and windowed either
+	serially or on a pool of worker processes, and the results are stored in `self.data` in the order of the tasks, so that both paths yield identical outputs.
+	"""
+	_params_key = None
+	_tolerant = False
+
+	def _slot_key(self, channel, metadata):
+		return channel
+
+	def _slot(self, channel, metadata):
+		key = self._slot_key(channel, metadata)
+		slot = self.data
+		*parents, last = key if isinstance(key, tuple) else (key,)
+		for part in parents:
+			slot = slot[part]
+		# e.g. the slot of a sampling frequency whose files were added after the digestor was created
+		return slot.setdefault(last, [])
+
+	def _store(self, metadata, windows, as_bank = False):
+		for channel, channel_windows in windows.items():
+			if as_bank:
+				self._slot(channel, metadata).append((channel_windows, metadata))
+				continue
+
+			# windows memory-mapped from the cache are copy-on-write, so that they back the DataFrame without being copied
+			temp_df = pd.DataFrame(np.require(channel_windows, requirements = 'W'))
+			for column, value in metadata.items():
+				temp_df[column] = value
+			self._slot(channel, metadata).append(temp_df)
+
+	def _listing_key(self, **kwargs):
+		# the attributes the tasks are listed from (e.g. `channels`, `reps` or `files`), and the keys of `data` some digestors take the channels from
+		attributes = [(name, repr(value)) for name, value in vars(self).items() if not name.startswith('_') and name not in ('data', 'corrupted_files')]
+		options = inspect.signature(self._tasks).bind(**kwargs)
+		options.apply_defaults()
+		return attributes, list(getattr(self, 'data', {})), sorted(options.arguments.items())
+
+	def _listed(self, **kwargs):
+		"""
+		The tasks of the files to mine (see `_tasks`). The listing is reused as long as the attributes it depends on, the options and the modification times of the
+		listed directories (or archives) are unchanged, so that added or removed files and changes of e.g. `channels` are taken into account.
+		"""
+		key = self._listing_key(**kwargs)
+		cached = getattr(self, '_listing', None)
+		if cached is not None and cached[0] == key and _unchanged(cached[1]):
+			return list(cached[2])
+
+		started = time.time_ns()
+		_listings.stamps = {}
+		try:
+			tasks = self._tasks(**kwargs)
+		finally:
+			stamps, _listings.stamps = _listings.stamps, None
+		# a directory modified just before it was listed may be modified again within the resolution of its modification time, unnoticed: its listing is not reused
+		if all(stamp < started - 2 * 10**9 for stamp in stamps.values()):
+			self._listing = (key, stamps, tasks)
+		return list(tasks)
+
+	def _indexed(self, **kwargs):
+		"""
+		The tasks of the files to mine (see `_listed`) and their index.
+		"""
+		tasks = self._listed(**kwargs)
+		index = pd.DataFrame(
+			[{'path': path, 'size': file_size(path), **metadata} for _, path, metadata, _ in tasks],
+			columns = None if tasks else ['path', 'size']
+		)
+		return tasks, index
+
+	def index(self, **kwargs):
+		"""
+		The index of the files to mine, built by listing the dataset's directories: one row per file, holding its path, its size (in bytes) and the metadata parsed from its name and location.
+
+		Parameters
+		----------
+		**kwargs
+			Further options of the dataset's `mine()` (e.g. `synchronous_only` for CWRU).
+
+		Returns
+		-------
+		pd.DataFrame
+			The file index, in the order in which the files are mined.
+		"""
+		return self._indexed(**kwargs)[1]
+
+	def _select(self, query = None, shard_index = None, num_shards = None, **kwargs):
+		"""
+		The tasks of the files of the index matching `query` (see `mine()`), restricted to the files of a shard if `num_shards` is given (see `mine_shard()`).
+		"""
+		if query is None and num_shards is None:
+			return self._listed(**kwargs)
+
+		tasks, index = self._indexed(**kwargs)
+
+		if query is None:
+			mask = np.ones(len(index), dtype = bool)
+		elif isinstance(query, str):
+			mask = index.eval(query)
+		elif isinstance(query, dict):
+			mask = np.ones(len(index), dtype = bool)
+			for column, accepted in query.items():
+				if not isinstance(accepted, (list, tuple, set, frozenset)):
+					accepted = [accepted]
+				mask &= index[column].isin(list(accepted)).to_numpy()
+		else:
+			mask = query(index)
+		positions = np.flatnonzero(np.asarray(mask, dtype = bool))
+
+		if num_shards is not None:
+			paths = [self._relative_path(tasks[position][1]) for position in positions]
+			positions = positions[_shard(index['size'].to_numpy()[positions].tolist(), paths, shard_index, num_shards)]
+		return [tasks[position] for position in positions]
+
+	def _relative_path(self, path):
+		return os.path.relpath(path, self.base_dir).replace(os.sep, '/')
+
+	def _results(self, tasks, mining_params, n_workers = None, executor = None, cache_dir = None, dtype = None):
+		"""
+		Lazily load and window the files of the given tasks, yielding `(metadata, windows)` tuples in the order of the tasks.
+
+		Parameters
+		----------
+		tasks : list of tuple
+			The files to mine, as `(reader, path, metadata, reader_kwargs)` tuples.
+		mining_params : dict
+			The mining parameters, as passed to `mine()`.
+		n_workers : int, optional
+			Number of worker processes used to load and window the files; files are processed serially if None (default) or 1.
+		executor : concurrent.futures.Executor, optional
+			An executor to use instead of a pool of `n_workers` processes.
+		cache_dir : str, optional
+			Directory of the on-disk cache of mined windows; see `_mine_file`.
+		dtype : numpy dtype, optional
+			The dtype of the windows; see `_mine_file`.
+
+		Notes
+		-----
+		For datasets with known corrupted files (`_tolerant` digestors), files that fail to load are skipped and recorded in the `corrupted_files` attribute.
+		"""
+		for _, result in self._task_results(tasks, mining_params, n_workers, executor, cache_dir, dtype):
+			yield result
+
+	def _task_results(self, tasks, mining_params, n_workers = None, executor = None, cache_dir = None, dtype = None):
+		"""
+		Same as `_results`, yielding `(task, (metadata, windows))` tuples.
+		"""
+		if self._tolerant:
+			self.corrupted_files = {}
+
+		func = partial(_mine_file, mining_params = mining_params, params_key = self._params_key, tolerant = self._tolerant, cache_dir = cache_dir, dtype = dtype)
+		for task, result in zip(tasks, _map_tasks(func, tasks, n_workers, executor)):
+			if isinstance(result, Exception):
+				self.corrupted_files[task[1]] = result
+			else:
+				yield task, result
+
+	def mine(self, mining_params, n_workers = None, executor = None, cache_dir = None, as_bank = False, query = None, dtype = None):
+		"""
+		Mine the data in the dataset based on mining parameters.
+
+		Parameters
+		----------
+		mining_params : dict
+			A dictionary containing the mining parameters; its keys are `win_len` and `hop_len` - the length of the window and the hop length for the window, respectively. Optional `freq_filter` and `zero_phase` keys filter every record once, before it is windowed (see `splitter`).
+			For datasets recorded at several sampling frequencies (MFPT and CWRU), a dictionary of such dictionaries, whose keys are the sampling frequencies (e.g. 97656 and 48828 for MFPT, '12K' and '48K' for CWRU).
+		n_workers : int, optional
+			Number of worker processes used to load and window the files in parallel; files are processed serially if None (default). The mined data is identical in both cases.
+		executor : concurrent.futures.Executor, optional
+			An executor to use instead of a pool of `n_workers` processes.
+		cache_dir : str, optional
+			If given, mined windows are cached in this directory and memory-mapped from it on subsequent runs; a file is mined again whenever it changes (size or modification time) or the mining parameters or channels change.
+		as_bank : bool, optional
+			Whether to store the mined data of each slot of `data` as a single SignalBank (a contiguous 2-D array of windows plus a categorical metadata table) instead of a list of `pd.DataFrame` objects. Default is False.
+		query : str, dict or callable, optional
+			Only mine the files matching the query, which is evaluated on the file index (see `index()`) before any file is opened: either a pandas query string (e.g. `"state in ['IR', 'OR']"`), a dictionary of accepted metadata values (e.g. `{'state': ['IR', 'OR']}`), or a callable returning a boolean mask of the index. Default is None (all files).
+		dtype : numpy dtype, optional
+			The dtype of the mined windows, e.g. np.float32 to halve their memory; defaults to that of the loaded signals (float64).
+
+		Returns
+		-------
+		None
+
+		Notes
+		-----
+		For datasets with known corrupted files (PU), files that cannot be loaded are skipped and recorded in the `corrupted_files` attribute, a dictionary whose keys are file paths and values are the raised exceptions.
+		"""
+		self._mine(self._select(query), mining_params, n_workers, executor, cache_dir, as_bank, dtype)
+
+	def _mine(self, tasks, mining_params, n_workers = None, executor = None, cache_dir = None, as_bank = False, dtype = None):
+		"""
+		Mine the given tasks into `self.data`; see `_results` for the parameters. If `as_bank` is True, each slot of `self.data` is stored as a single SignalBank instead of a list of pd.DataFrame objects.
+		"""
+		self._collect(self._results(tasks, mining_params, n_workers, executor, cache_dir, dtype), as_bank)
+
+	def _collect(self, results, as_bank = False):
+		self.data = _unbank_slots(self.data, as_bank)
+
+		for metadata, windows in results:
+			self._store(metadata, windows, as_bank = as_bank)
+
+		if as_bank:
+			self.data = _bank_slots(self.data)
+
+	def iter_mine(self, mining_params, batch_size = None, n_workers = None, executor = None, cache_dir = None, query = None, shard_index = None, num_shards = None, dtype = None, **kwargs):
+		"""
+		Mine the dataset as a stream of SignalBank batches, without accumulating the mined data in `self.data`.
+
+		Parameters
+		----------
+		mining_params : dict
+			The mining parameters, as passed to `mine()`.
+		batch_size : int, optional
+			Number of windows per yielded batch; batches of a key are cut across file boundaries, and only the last batch of each key may be smaller. If None (default), the windows of each file are yielded as they are mined.
+		n_workers : int, optional
+			Number of worker processes used to load and window the files in parallel; at most `2 * n_workers` files are in flight at once. Files are processed serially if None (default).
+		executor : concurrent.futures.Executor, optional
+			An executor to use instead of a pool of `n_workers` processes.
+		cache_dir : str, optional
+			If given, mined windows are cached in this directory and memory-mapped from it on subsequent runs (see `mine()`).
+		query : str, dict or callable, optional
+			Only mine the files of the index matching the query (see `mine()`).
+		shard_index, num_shards : int, optional
+			If given, only mine the files of the `shard_index`-th of `num_shards` shards of the dataset (see `mine_shard()`).
+		dtype : numpy dtype, optional
+			The dtype of the windows (see `mine()`).
+		**kwargs
+			Further options of the dataset's `mine()` (e.g. `synchronous_only` for CWRU).
+
+		Yields
+		------
+		tuple
+			A `(key, bank)` tuple, where `bank` is a SignalBank of windows and their metadata and `key` locates them in `self.data` (e.g. the channel, or `(channel, fs)` for CWRU).
+		"""
+		blocks = (
+			(self._slot_key(channel, metadata), channel_windows, metadata)
+			for metadata, windows in self._results(self._select(query, shard_index, num_shards, **kwargs), mining_params, n_workers, executor, cache_dir, dtype)
+			for channel, channel_windows in windows.items()
+		)
+
+		if batch_size is None:
+			for key, windows, metadata in blocks:
+				yield key, SignalBank.from_blocks([(windows, metadata)])
+			return
+
+		pending = {}
+		for key, windows, metadata in blocks:
+			queue = pending.setdefault(key, deque())
+			queue.append((windows, metadata))
+			while sum(len(queued) for queued, _ in queue) >= batch_size:
+				batch, taken = [], 0
+				while taken < batch_size:
+					queued, queued_metadata = queue.popleft()
+					take = min(len(queued), batch_size - taken)
+					batch.append((queued[:take], queued_metadata))
+					if take < len(queued):
+						queue.appendleft((queued[take:], queued_metadata))
+					taken += take
+				yield key, SignalBank.from_blocks(batch)
+
+		for key, queue in pending.items():
+			if queue:
+				yield key, SignalBank.from_blocks(list(queue))
+
+	def mine_shard(self, mining_params, shard_index, num_shards, output_dir, n_workers = None, executor = None, cache_dir = None, query = None, dtype = None, **kwargs):
+		"""
+		Mine one shard of the dataset into a directory, to be merged with the other shards by `merge_shards()`.
+
+		Parameters
+		----------
+		mining_params : dict
+			The mining parameters, as passed to `mine()`.
+		shard_index : int
+			The index of the shard to mine, from 0 to `num_shards - 1`.
+		num_shards : int
+			The number of shards the dataset is split into. Files are assigned to shards from the file index (see `index()`), balancing their total size;
+			the partition only depends on the paths (relative to the base directory) and sizes of the files, so that each node can mine its shard without coordination.
+		output_dir : str
+			The directory where the windows of the shard are written, one memory-mappable entry per file, along with a `shard.json` file listing them; the
+			entries of a former run are removed.
+		n_workers : int, optional
+			Number of worker processes used to load and window the files of the shard in parallel; files are processed serially if None (default).
+		executor : concurrent.futures.Executor, optional
+			An executor to use instead of a pool of `n_workers` processes.
+		cache_dir : str, optional
+			If given, mined windows are cached in this directory and memory-mapped from it on subsequent runs (see `mine()`).
+		query : str, dict or callable, optional
+			Only mine the files of the index matching the query (see `mine()`); the same query must be given to `merge_shards()`.
+		dtype : numpy dtype, optional
+			The dtype of the windows (see `mine()`).
+		**kwargs
+			Further options of the dataset's `mine()` (e.g. `synchronous_only` for CWRU).
+
+		Returns
+		-------
+		None
+		"""
+		entries_dir = os.path.join(output_dir, 'entries')
+		shutil.rmtree(entries_dir, ignore_errors = True)
+		os.makedirs(entries_dir)
+
+		files = {}
+		tasks = self._select(query, shard_index, num_shards, **kwargs)
+		for i, (task, (metadata, windows)) in enumerate(self._task_results(tasks, mining_params, n_workers, executor, cache_dir, dtype)):
+			_save_cached(os.path.join(entries_dir, str(i)), metadata, windows)
+			files[self._relative_path(task[1])] = str(i)
+
+		corrupted = {self._relative_path(path): repr(error) for path, error in getattr(self, 'corrupted_files', {}).items()} if self._tolerant else {}
+		temp_path = os.path.join(output_dir, 'shard.json.tmp')
+		with open(temp_path, 'w') as f:
+			json.dump({'shard_index': shard_index, 'num_shards': num_shards, 'files': files, 'corrupted_files': corrupted}, f)
+		os.replace(temp_path, os.path.join(output_dir, 'shard.json'))
+
+	def merge_shards(self, output_dirs, as_bank = False, query = None, **kwargs):
+		"""
+		Merge the shards mined by `mine_shard()` into `self.data`; the result is identical to the one of `mine()`.
+
+		Parameters
+		----------
+		output_dirs : list of str
+			The output directories of all of the shards.
+		as_bank : bool, optional
+			Whether to store the merged data as a single SignalBank per slot (see `mine()`). Default is False.
+		query : str, dict or callable, optional
+			The query the shards were mined with (see `mine()`).
+		**kwargs
+			Further options of the dataset's `mine()` (e.g. `synchronous_only` for CWRU), as given to `mine_shard()`.
+
+		Returns
+		-------
+		None
+
+		Notes
+		-----
+		Files are merged in the order of the file index of this digestor, so the shards may have been mined on nodes listing directories in different orders.
+		Raises a ValueError if any file of the index is missing from the shards.
+		"""
+		entries, corrupted = {}, {}
+		for output_dir in output_dirs:
+			with open(os.path.join(output_dir, 'shard.json'), 'r') as f:
+				shard = json.load(f)
+			entries.update({path: os.path.join(output_dir, 'entries', name) for path, name in shard['files'].items()})
+			corrupted.update(shard['corrupted_files'])
+
+		tasks = self._select(query, **kwargs)
+		missing = [task[1] for task in tasks if self._relative_path(task[1]) not in entries and self._relative_path(task[1]) not in corrupted]
+		if missing:
+			raise ValueError(f'{len(missing)} files are missing from the shards, e.g. {missing[0]!r}.')
+
+		if self._tolerant:
+			self.corrupted_files = {task[1]: IOError(corrupted[self._relative_path(task[1])]) for task in tasks if self._relative_path(task[1]) in corrupted}
+		self._collect((_load_cached(entries[self._relative_path(task[1])]) for task in tasks if self._relative_path(task[1]) in entries), as_bank)
+
+
+class KAIST(_Digestor):
 	def __init__(self, base_directory, files, channels = list(range(4))):
 		"""
 		Parameters
@@ -16,7 +721,7 @@ class KAIST:
 		The list of files to include during the mining process.
 		channels : list of int, optional
 		The list of channels to include; 0, 1, 2 and 3 correspond to x direction - housing A, y direction - housing A, x direction - housing B and y direction - housing B, respectively. Default value is [0, 1, 2, 3].
-		
+
 		Attributes
 		----------
 		base_dir : str
@@ -30,19 +735,8 @@ class KAIST:
 		self.files = files
 		self.data = {key: [] for key in channels}
 
-	def mine(self, mining_params):
-		"""
-		Mine the data in the dataset based on mining parameters.
-
-		Parameters
-		----------
-		mining_params : dict
-		A dictionary containing the mining parameters; its keys are `win_len` and `hop_len` - the length of the window and the hop length for the window, respectively.
-
-		Returns
-		-------
-		None
-		"""
+	def _tasks(self):
+		tasks = []
 		for file in self.files:
 			file_name_split = file.split('_')
 			if len(file_name_split) > 2:
@@ -54,80 +748,40 @@ class KAIST:
 				state = file_name_split[1].split('.')[0]
 				severity = '-'
 
-			mat_contents = sio.loadmat(self.base_dir + file)
+			tasks.append((_read_kaist, self.base_dir + file, {'load': load, 'state': state, 'severity': severity}, {'channels': list(self.data.keys())}))
+
+		return tasks
 
-			for key in self.data.keys():
-				temp_df = splitter(mat_contents['Signal'][0][0][1][0][0][0][:, key], mining_params['win_len'], mining_params['hop_len'])
-				temp_df['load'], temp_df['state'], temp_df['severity'] = load, state, severity
-				self.data[key].append(temp_df)
 
-class MFPT:
+class MFPT(_Digestor):
+	_params_key = 'Fs'
+
 	def __init__(self, base_directory, folders):
 		self.base_dir = base_directory
 		self.folders = folders
 
 		self.data = {
 			97656: [],
-			48828: [], 
+			48828: [],
 		}
 
-	def mine(self, mining_params):
-		"""
-		Mines the dataset by processing files in specified folders and extracts relevant data.
-
-		Parameters
-		----------
-		mining_params : dict
-			A dictionary containing the mining parameters with keys as sampling frequencies 
-			and values as dictionaries with 'win_len' (window length) and 'hop_len' (hop length) 
-			for signal processing.
-
-		Processing Details
-		------------------
-		- Iterates over each folder and file in the specified base directory.
-		- Loads '.mat' files and extracts data based on the file's prefix:
-		- 'baseline': Normal state data is extracted.
-		- 'OuterRaceFault': Data indicating outer race fault is extracted.
-		- 'InnerRaceFault': Data indicating inner race fault is extracted.
-		- Extracts relevant information such as sampling frequency (Fs), load, rotational speed, 
-		and state from the file data.
-		- Uses a splitter function to divide the data into windows based on the specified 
-		window length and hop length.
-		- Appends the processed data, along with its attributes, into the corresponding 
-		lists in the data attribute.
-
-		Returns
-		-------
-		None
-		"""
+	def _slot_key(self, channel, metadata):
+		return metadata['Fs']
 
+	def _tasks(self):
+		tasks = []
 		for folder in self.folders:
 			folder_path = os.path.join(self.base_dir, folder)
-			for file in os.listdir(folder_path):
-				if file.endswith('.mat'):
-					file_path = os.path.join(folder_path, file)
-					mat_data = sio.loadmat(file_path)
-					bearing_data = mat_data['bearing'][0][0]
-
-					if file.startswith('baseline'):
-						Fs, load, rot_speed, signal = bearing_data[0][0][0], bearing_data[2][0][0], bearing_data[3][0][0], bearing_data[1]
-						state = 'Normal'
-					elif file.startswith('OuterRaceFault'):
-						Fs, load, rot_speed, signal = bearing_data[3][0][0], bearing_data[1][0][0], bearing_data[0][0][0], bearing_data[2]
-						state = 'OR'
-					elif file.startswith('InnerRaceFault'):
-						Fs, load, rot_speed, signal = bearing_data[3][0][0], bearing_data[1][0][0], bearing_data[0][0][0], bearing_data[2]
-						state = 'IR'
-					else:
-						continue
+			for file in listdir(folder_path):
+				if file.endswith('.mat') and file.startswith(('baseline', 'OuterRaceFault', 'InnerRaceFault')):
+					tasks.append((_read_mfpt, os.path.join(folder_path, file), {}, {}))
 
-					temp_df = splitter(signal.reshape(-1), mining_params[Fs]['win_len'], mining_params[Fs]['hop_len'])
-					temp_df['Fs'], temp_df['load'], temp_df['rot_speed'], temp_df['state'] = Fs, load, rot_speed, state
-					self.data[Fs].append(temp_df)
+		return tasks
 
 
+class CWRU(_Digestor):
+	_params_key = 'fs'
 
-class CWRU:
 	def __init__(self, base_directory, channels = ['FE', 'DE']):
 		"""
 		Parameters
@@ -150,10 +804,17 @@ class CWRU:
 		self.base_dir = base_directory
 		self.channels = channels
 
-		self.data = {channel:{Fs:[] for Fs in set([a.split('.')[0].split('_')[-1] for a in os.listdir(self.base_dir)])} for channel in self.channels}
+		self.data = {channel: {} for channel in self.channels}
+		for Fs in dict.fromkeys(metadata['fs'] for _, _, metadata, _ in self._listed()):
+			for channel in self.channels:
+				self.data[channel][Fs] = []
 
-	def mine(self, mining_params, synchronous_only=False):
-		for file in os.listdir(self.base_dir):
+	def _slot_key(self, channel, metadata):
+		return (channel, metadata['fs'])
+
+	def _tasks(self, synchronous_only = False):
+		tasks = []
+		for file in listdir(self.base_dir):
 			if file.endswith('.mat'):
 				file_parts = file.split('.mat')[0].split('_')
 				if len(file_parts) == 3:
@@ -163,36 +824,26 @@ class CWRU:
 				else:
 					defected_bearing, state, severity, rot_speed, fs = file_parts
 
-				mat_data = sio.loadmat(self.base_dir + file)
-				available_channels = {key.split('_')[1]: key for key in mat_data.keys() if key.split('_')[-1] == 'time'}
-
-				if synchronous_only:
-					if set(available_channels.keys()) >= set(self.channels):
-						for channel in self.channels:
-							if channel in available_channels.keys():
-								processed_data = splitter(
-									mat_data[available_channels[channel]].reshape(-1),
-									mining_params[fs]['win_len'],
-									mining_params[fs]['hop_len']
-								)
-								processed_data['state'], processed_data['defected_bearing'], processed_data['severity'], processed_data['rot_speed'], processed_data['fs'] = (
-									state, defected_bearing, severity, rot_speed, fs
-								)
-								self.data[channel][fs].append(processed_data)
-				else:
-					for channel in self.channels:
-						if channel in available_channels.keys():
-							processed_data = splitter(
-								mat_data[available_channels[channel]].reshape(-1),
-								mining_params[fs]['win_len'],
-								mining_params[fs]['hop_len']
-							)
-							processed_data['state'], processed_data['defected_bearing'], processed_data['severity'], processed_data['rot_speed'], processed_data['fs'] = (
-								state, defected_bearing, severity, rot_speed, fs
-							)
-							self.data[channel][fs].append(processed_data)
-
-class SEU:
+				metadata = {'state': state, 'defected_bearing': defected_bearing, 'severity': severity, 'rot_speed': rot_speed, 'fs': fs}
+				tasks.append((_read_cwru, self.base_dir + file, metadata, {'channels': self.channels, 'synchronous_only': synchronous_only}))
+
+		return tasks
+
+	def mine(self, mining_params, synchronous_only=False, n_workers = None, executor = None, cache_dir = None, as_bank = False, query = None, dtype = None):
+		"""
+		Mine the data in the dataset based on mining parameters; see `_Digestor.mine()` for the other parameters.
+
+		Parameters
+		----------
+		mining_params : dict
+			A dictionary whose keys are sampling frequencies (e.g. '12K' and '48K') and values are dictionaries with `win_len` and `hop_len` keys - the length of the window and the hop length for the window, respectively.
+		synchronous_only : bool, optional
+			Whether to only mine files in which all of the `channels` are available. Default is False.
+		"""
+		self._mine(self._select(query, synchronous_only = synchronous_only), mining_params, n_workers, executor, cache_dir, as_bank, dtype)
+
+
+class SEU(_Digestor):
 	def __init__(self, base_directory, channels = list(range(8))):
 		"""
 		Parameters
@@ -216,44 +867,23 @@ class SEU:
 
 		self.data = {key:[] for key in self.channels}
 
-	def mine(self, mining_params):
-		"""
-		Mine the data in the dataset based on mining parameters.
-
-		Parameters
-		----------
-		mining_params : dict
-		A dictionary containing the mining parameters; its keys are `win_len` and `hop_len` - the length of the window and the hop length for the window, respectively.
-
-		Returns
-		-------
-		None
-		"""
-		for sub_directory in os.listdir(self.base_dir):
-			for file in os.listdir(self.base_dir + sub_directory):
+	def _tasks(self):
+		tasks = []
+		for sub_directory in listdir(self.base_dir):
+			for file in listdir(self.base_dir + sub_directory):
 				if file.endswith('.csv'):
 					file_split = file.split('.csv')[0].split('_')
 					test_bed = sub_directory
 					state = file_split[0]
 					rot_speed = file_split[1]
-					with open('SEU/' + sub_directory + '/' + file, 'r', encoding='gb18030', errors='ignore') as f:
-						content=f.readlines()
-						if file == "ball_20_0.csv":
-							arr = np.array([i.split(',')[:-1] for i in content[16:]]).astype(float)
-						else:
-							arr = np.array([i.split('\t')[:-1] for i in content[16:]]).astype(float)
-
-					print('Mining: ', file)
-					for key in self.data.keys():
-						temp_df = splitter(arr[:, key], mining_params['win_len'], mining_params['hop_len'])
-						temp_df['test_bed'] = test_bed
-						temp_df['state'] = state
-						temp_df['rot_speed'] = rot_speed
-						self.data[key].append(temp_df)
-						gc.collect()
-
-
-class MaFauldDa:
+					delimiter = ',' if file == "ball_20_0.csv" else '\t'
+					metadata = {'test_bed': test_bed, 'state': state, 'rot_speed': rot_speed}
+					tasks.append((_read_seu, self.base_dir + sub_directory + '/' + file, metadata, {'channels': list(self.data.keys()), 'delimiter': delimiter}))
+
+		return tasks
+
+
+class MaFauldDa(_Digestor):
 	def __init__(self, base_directory, folders, channels = list(range(8))):
 		"""
 		Parameters
@@ -282,71 +912,33 @@ class MaFauldDa:
 
 		self.data = {key: [] for key in self.channels}
 
-	def mine(self, mining_params):
-		"""
-		Mines the dataset by processing files in specified folders and extracts relevant data.
-
-		Parameters
-		----------
-		mining_params : dict
-			A dictionary containing the mining parameters with keys 'win_len' 
-			(window length) and 'hop_len' (hop length) for signal processing.
-
-		Processing Details
-		------------------
-		- Iterates over each folder in the 'folders' attribute.
-		- For 'normal' folder, processes files and extracts data with 'normal' state 
-		and no severity.
-		- For 'underhang' and 'overhang' folders, processes subfolders and files to 
-		extract data, appending state and severity based on directory structure.
-		- For other folders, assumes folder name as state and processes files to 
-		extract data appending state and severity.
-		- Uses a splitter function to divide the data into windows based on the 
-		specified window length and hop length.
-		- Appends the processed data, along with its attributes, into the 
-		corresponding lists in the 'data' attribute.
-
-		Returns
-		-------
-		None
-		"""
-
+	def _tasks(self):
+		tasks = []
+		reader_kwargs = {'channels': list(self.data.keys())}
 		for folder in self.folders:
 			if folder == 'normal':
 				state = 'normal'
 				sev = '_'
-				for file in os.listdir(self.base_dir + folder):
-					df = pd.read_csv(self.base_dir + folder + '/' +  file, header = None)
-					for key in self.data.keys():
-						temp_df = splitter(df[key].values, mining_params['win_len'], mining_params['hop_len'])
-						temp_df['state'] = state
-						temp_df['severity'] = sev
-						self.data[key].append(temp_df)
+				for file in listdir(self.base_dir + folder):
+					tasks.append((_read_numeric_csv, self.base_dir + folder + '/' +  file, {'state': state, 'severity': sev}, reader_kwargs))
 
 			elif folder in ['underhang', 'overhang']:
-				for subfolder in os.listdir(self.base_dir + folder + '/'):
+				for subfolder in listdir(self.base_dir + folder + '/'):
 					state = folder + '_' + subfolder
-					for sev in os.listdir(self.base_dir + folder + '/' + subfolder + '/'):
-						for file in os.listdir(self.base_dir + folder + '/' + subfolder + '/' + sev + '/'):
-							df = pd.read_csv(self.base_dir + folder + '/' + subfolder + '/' + sev + '/' + file, header = None)
-							for key in self.data.keys():
-								temp_df = splitter(df[key].values, mining_params['win_len'], mining_params['hop_len'])
-								temp_df['state'] = state
-								temp_df['severity'] = sev
-								self.data[key].append(temp_df)
-				
+					for sev in listdir(self.base_dir + folder + '/' + subfolder + '/'):
+						for file in listdir(self.base_dir + folder + '/' + subfolder + '/' + sev + '/'):
+							tasks.append((_read_numeric_csv, self.base_dir + folder + '/' + subfolder + '/' + sev + '/' + file, {'state': state, 'severity': sev}, reader_kwargs))
+
 			else:
 				state = folder
-				for sev in os.listdir(self.base_dir + folder + '/'):
-					for file in os.listdir(self.base_dir + folder + '/' + sev):
-						df = pd.read_csv(self.base_dir + folder + '/' + sev + '/' + file, header = None)
-						for key in self.data.keys():
-							temp_df = splitter(df[key].values, mining_params['win_len'], mining_params['hop_len'])
-							temp_df['state'] = state
-							temp_df['severity'] = sev
-							self.data[key].append(temp_df)
-
-class MUET():
+				for sev in listdir(self.base_dir + folder + '/'):
+					for file in listdir(self.base_dir + folder + '/' + sev):
+						tasks.append((_read_numeric_csv, self.base_dir + folder + '/' + sev + '/' + file, {'state': state, 'severity': sev}, reader_kwargs))
+
+		return tasks
+
+
+class MUET(_Digestor):
 	def __init__(self, base_directory, folders, channels = list(range(1,4))):
 		"""
 		Parameters
@@ -373,44 +965,29 @@ class MUET():
 
 		self.data = {key: [] for key in self.channels}
 
-	def mine(self, mining_params):
-		"""
-		Mine the data in the dataset based on mining parameters.
-
-		Parameters
-		----------
-		mining_params : dict
-			A dictionary containing the mining parameters; its keys are `win_len` and `hop_len` - the length of the window and the hop length for the window, respectively.
-
-		Returns
-		-------
-		None
-		"""
+	def _tasks(self):
+		tasks = []
+		reader_kwargs = {'channels': list(self.data.keys()), 'header': 0}
 		for folder in self.folders:
 			if folder.startswith('Healthy'):
 				state = 'healthy'
 				severity = '-'
-				for file in os.listdir(self.base_dir + folder + '/'):
+				for file in listdir(self.base_dir + folder + '/'):
 					if file.endswith('.csv'):
 						load = file.split(' ')[1] + ' ' + file.split(' ')[1].split('.')[0]
-						df = pd.read_csv(self.base_dir + folder + '/' + file)
-						for i in self.data.keys():
-							temp_df = splitter(df.iloc[:, i].to_numpy(), mining_params['win_len'], mining_params['hop_len'])
-							temp_df['state'], temp_df['severity'], temp_df['load'] = state, severity, load
-							self.data[i].append(temp_df)
+						tasks.append((_read_numeric_csv, self.base_dir + folder + '/' + file, {'state': state, 'severity': severity, 'load': load}, reader_kwargs))
 			else:
-				for file in os.listdir(self.base_dir + folder + '/'):
+				for file in listdir(self.base_dir + folder + '/'):
 					if file.endswith('.csv'):
-						df = pd.read_csv(self.base_dir + folder + '/' + file)
-						for i in self.data.keys():
-							temp_df = splitter(df.iloc[:, i].to_numpy(), mining_params['win_len'], mining_params['hop_len'])
-							severity = folder.split('-')[0]
-							state =''.join(list(file.split('-')[0])[3:])
-							load = file.split('-')[1].split('.')[0]
-							temp_df['state'], temp_df['severity'], temp_df['load'] = state, severity, load
-							self.data[i].append(temp_df)
-
-class UoO():
+						severity = folder.split('-')[0]
+						state =''.join(list(file.split('-')[0])[3:])
+						load = file.split('-')[1].split('.')[0]
+						tasks.append((_read_numeric_csv, self.base_dir + folder + '/' + file, {'state': state, 'severity': severity, 'load': load}, reader_kwargs))
+
+		return tasks
+
+
+class UoO(_Digestor):
 	def __init__(self, base_directory, channels = ['Channel_1', 'Channel_2'], reps = list(range(1,4))):
 		"""
 		Parameters
@@ -440,34 +1017,22 @@ class UoO():
 
 		self.data = {key: [] for key in self.channels}
 
-	def mine(self, mining_params):
-		"""
-		Mine the data in the dataset based on mining parameters.
-
-		Parameters
-		----------
-		mining_params : dict
-			A dictionary containing the mining parameters; its keys are `win_len` and `hop_len` - the length of the window and the hop length for the window, respectively.
-
-		Returns
-		-------
-		None
-		"""
-		
-		for file in os.listdir(self.base_dir):
+	def _tasks(self):
+		tasks = []
+		for file in listdir(self.base_dir):
 			if file.endswith('.mat'):
 				rep = int(file.split('.')[0].split('-')[-1])
 				if rep in self.reps:
 					state = file.split('.')[0].split('-')[:-1][0]
 					loading = file.split('.')[0].split('-')[:-1][1]
-					mat_data = sio.loadmat(self.base_dir + file)
-					for channel in self.data.keys():
-						temp_df = splitter(mat_data[channel].reshape((-1)), mining_params['win_len'], mining_params['hop_len'])
-						temp_df['state'], temp_df['loading'], temp_df['rep'] = state, loading, rep
-						self.data[channel].append(temp_df)
+					tasks.append((_read_mat_variables, self.base_dir + file, {'state': state, 'loading': loading, 'rep': rep}, {'channels': list(self.data.keys())}))
 
+		return tasks
+
+
+class PU(_Digestor):
+	_tolerant = True
 
-class PU():
 	def __init__(self, base_directory, folders, channels = ['CP1', 'CP2', 'Vib'], reps = list(range(1, 21))):
 		"""
 		Parameters
@@ -501,42 +1066,16 @@ class PU():
 		self.reps = reps
 		self.data = {key: [] for key in self.channels}
 
-	def mine(self, mining_params):
-		self.corrupted_files = {}
+	def _tasks(self):
+		tasks = []
 		for folder in self.folders:
-			for file in os.listdir(self.base_dir + folder):
+			for file in listdir(self.base_dir + folder):
 				if file.endswith('.mat'):
-					if int(file.split('.')[0].split('_')[-1]) in self.reps:
-						rot_speed, load_torque, radial_force, code, rep = file.split('.')[0].split('_')
-						try:
-							mat_data = sio.loadmat(self.base_dir + folder + '/' + file)
-
-							if 'CP1' in self.channels:
-								temp_df = splitter(mat_data[file.split('.')[0]]['Y'][0][0][0][1][2].reshape((-1)), mining_params['win_len'], mining_params['hop_len'])
-								temp_df['rot_speed'] = rot_speed
-								temp_df['load_torque'] = load_torque
-								temp_df['radial_force'] = radial_force
-								temp_df['code'] = code
-								temp_df['rep'] = rep
-								self.data['CP1'].append(temp_df)
-
-							if 'CP2' in self.channels:
-								temp_df = splitter(mat_data[file.split('.')[0]]['Y'][0][0][0][2][2].reshape((-1)), mining_params['win_len'], mining_params['hop_len'])
-								temp_df['rot_speed'] = rot_speed
-								temp_df['load_torque'] = load_torque
-								temp_df['radial_force'] = radial_force
-								temp_df['code'] = code
-								temp_df['rep'] = rep
-								self.data['CP2'].append(temp_df)
-
-							if 'Vib' in self.channels:
-								temp_df = splitter(mat_data[file.split('.')[0]]['Y'][0][0][0][6][2].reshape((-1)), mining_params['win_len'], mining_params['hop_len'])
-								temp_df['rot_speed'] = rot_speed
-								temp_df['load_torque'] = load_torque
-								temp_df['radial_force'] = radial_force
-								temp_df['code'] = code
-								temp_df['rep'] = rep
-								self.data['Vib'].append(temp_df)
-						except Exception as e:
-							self.corrupted_files[self.base_dir + folder + '/' + file] = e
+					name_parts = file.split('.')[0].split('_')
+					if int(name_parts[-1]) in self.reps:
+						rot_speed, load_torque, radial_force, code, rep = name_parts
+						metadata = {'rot_speed': rot_speed, 'load_torque': load_torque, 'radial_force': radial_force, 'code': code, 'rep': rep}
+						tasks.append((_read_pu, self.base_dir + folder + '/' + file, metadata, {'channels': self.channels}))
+
+		return tasks
 
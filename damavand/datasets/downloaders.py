@@ -2,19 +2,321 @@ import requests
 import os
 import time
 import json
-from zipfile import ZipFile
-from rarfile import RarFile
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from damavand.damavand.datasets.archives import extract_archive, extract_archives
+
+
+VERIFIED_FILE_NAME = ".verified.json"
+CHECKSUM_ALGORITHMS = ("sha256", "blake2b", "sha1", "md5")
 
 
 def read_addresses():
     """
     Reads the addresses of datasets from the json file and returns as a dict
+
+    Each address is either a download link, or a manifest entry: a dict holding the download link under "url", and optionally
+    the expected "size" of the file (in bytes) and its checksum under the name of its algorithm (e.g. "sha256"); the downloaders
+    accept both forms, and use the entries to skip valid files and re-fetch corrupt ones (see build_manifest).
     """
     with open("damavand/damavand/datasets/addresses.json", "r") as f:
         data = json.load(f)
     return data
 
 
+def _entry(address):
+    return {"url": address} if isinstance(address, str) else address
+
+
+def file_digest(path, algorithm="sha256", chunk_size=2**22):
+    """
+    Computes the checksum of a file, reading it in large chunks into a single reused buffer.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file.
+    algorithm : str, optional
+        The name of a hashlib algorithm. The default is "sha256".
+    chunk_size : int, optional
+        The size of the chunks read from the file, in bytes. The default is 4 MiB.
+
+    Returns
+    -------
+    str
+        The hexadecimal digest of the file.
+    """
+    digest = hashlib.new(algorithm)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as file:
+        while True:
+            size = file.readinto(buffer)
+            if not size:
+                break
+            digest.update(view[:size])
+    return digest.hexdigest()
+
+
+def _read_verified(download_path):
+    try:
+        with open(os.path.join(download_path, VERIFIED_FILE_NAME), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_verified(download_path, verified):
+    temp_path = os.path.join(download_path, VERIFIED_FILE_NAME + ".tmp")
+    with open(temp_path, "w") as f:
+        json.dump(verified, f, indent=1, sort_keys=True)
+    os.replace(temp_path, os.path.join(download_path, VERIFIED_FILE_NAME))
+
+
+def verify_file(file_path, address, verified=None):
+    """
+    Checks a downloaded file against its manifest entry.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the file.
+    address : str or dict
+        The download link or the manifest entry of the file (see read_addresses).
+    verified : dict, optional
+        The record of the previously verified files of the directory, as stored in its .verified.json file; a file whose size and
+        modification time are unchanged since it was recorded is not hashed again. New checksums are added to it.
+
+    Returns
+    -------
+    bool
+        Whether the file exists and matches the size and checksum of the entry; a file whose entry holds neither is valid if it exists,
+        as the downloaders only give a file its name once it is complete.
+    """
+    entry = _entry(address)
+    if not os.path.isfile(file_path):
+        return False
+    stat = os.stat(file_path)
+    if "size" in entry and stat.st_size != entry["size"]:
+        return False
+
+    algorithm = next((name for name in CHECKSUM_ALGORITHMS if name in entry), None)
+    if algorithm is None:
+        return True
+
+    verified = verified if verified is not None else {}
+    key = os.path.basename(file_path)
+    record = verified.get(key, {})
+    if record.get("size") != stat.st_size or record.get("mtime_ns") != stat.st_mtime_ns:
+        record = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if algorithm not in record:
+        record[algorithm] = file_digest(file_path, algorithm)
+        verified[key] = record
+    return record[algorithm] == entry[algorithm].lower()
+
+
+def build_manifest(addresses, download_path, algorithm="sha256"):
+    """
+    Builds manifest entries for a set of downloaded files, to be stored in addresses.json.
+
+    Parameters
+    ----------
+    addresses : dict
+        A dictionary where keys are file names and values are the download links or manifest entries (possibly nested, as for the PU dataset).
+    download_path : str
+        The directory where the files have been downloaded.
+    algorithm : str, optional
+        The checksum algorithm. The default is "sha256".
+
+    Returns
+    -------
+    dict
+        A dictionary of the same structure as addresses, whose values are manifest entries holding the link, size and checksum of each file;
+        files missing from download_path are left as they are.
+    """
+    manifest = {}
+    for key, address in addresses.items():
+        if isinstance(address, dict) and "url" not in address:
+            manifest[key] = build_manifest(address, download_path, algorithm)
+            continue
+        file_path = os.path.join(download_path, key)
+        if os.path.isfile(file_path):
+            manifest[key] = {**_entry(address), "size": os.path.getsize(file_path), algorithm: file_digest(file_path, algorithm)}
+        else:
+            manifest[key] = address
+    return manifest
+
+
+class RateLimiter:
+    def __init__(self, delay=0):
+        """
+        Spaces out the requests sent by any number of threads.
+
+        Parameters
+        ----------
+        delay : float, optional
+            The minimum time between the starts of two requests, in seconds. The default is 0 (no limit).
+        """
+        self.delay = delay
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """
+        Blocks until the next request is allowed to start.
+        """
+        if not self.delay:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.delay
+        time.sleep(start - now)
+
+
+def make_session(pool_size=8, retries=3):
+    """
+    Creates a requests.Session whose connections are pooled and kept alive across requests.
+
+    Parameters
+    ----------
+    pool_size : int, optional
+        The number of connections kept alive per host; it should not be lower than the number of threads sharing the session. The default is 8.
+    retries : int, optional
+        The number of times a request failing to connect, or answered with a 429/5xx status, is retried with an exponential backoff. The default is 3.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=retries, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def download_file(url, file_path, session=None, chunk_size=2**20, timeout=30, limiter=None):
+    """
+    Streams a file to disk, resuming a partial download if there is one.
+
+    Parameters
+    ----------
+    url : str
+        The download link.
+    file_path : str
+        The path of the downloaded file.
+    session : requests.Session, optional
+        The session used to send the request; a new one is created if None.
+    chunk_size : int, optional
+        The size of the chunks written to the file, in bytes. The default is 1 MiB.
+    timeout : float, optional
+        The maximum number of seconds to wait for the server to connect or send data. The default is 30.
+    limiter : RateLimiter, optional
+        The rate limiter to wait on before sending the request.
+
+    Notes
+    -----
+    Data is written into a `.tmp` file (the file name with its extension replaced), which is renamed to `file_path` once complete. If such a file already exists,
+    only its missing bytes are requested, through an HTTP `Range` header; servers that do not support ranges send the whole file, which then overwrites it.
+    Raises requests.HTTPError if the server answers with an error status.
+    """
+    session = session if session is not None else requests.Session()
+    temp_file_path = os.path.splitext(file_path)[0] + ".tmp"
+    offset = os.path.getsize(temp_file_path) if os.path.exists(temp_file_path) else 0
+
+    if limiter is not None:
+        limiter.wait()
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with session.get(url, stream=True, headers=headers, timeout=timeout) as response:
+        if response.status_code == 416 and offset:
+            # The partial file does not fit the remote one (e.g. it has changed); start over.
+            os.remove(temp_file_path)
+            return download_file(url, file_path, session, chunk_size, timeout, limiter)
+        if response.status_code not in (200, 206):
+            raise requests.HTTPError(f"Response status {response.status_code}", response=response)
+
+        resumed = response.status_code == 206 and response.headers.get("Content-Range", "").startswith(f"bytes {offset}-")
+        with open(temp_file_path, mode="ab" if resumed else "wb") as file:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                file.write(chunk)
+
+    os.replace(temp_file_path, file_path)
+
+
+def download_files(files, download_path, n_workers=4, chunk_size=2**20, delay=0, timeout=30, retries=3, session=None, skip_existing=True):
+    """
+    Downloads a set of files concurrently, on a bounded pool of threads sharing a pooled session.
+
+    Parameters
+    ----------
+    files : dict
+        A dictionary where keys are file names and values are the download links or manifest entries (see read_addresses).
+    download_path : str
+        The directory path where the files will be downloaded; it is created if it does not exist.
+    n_workers : int, optional
+        The number of files downloaded (or verified) at the same time. The default is 4.
+    chunk_size : int, optional
+        The size of the chunks written to the files, in bytes. The default is 1 MiB.
+    delay : float, optional
+        The minimum time between the starts of two requests, in seconds (see RateLimiter). The default is 0.
+    timeout : float, optional
+        The maximum number of seconds to wait for the server to connect or send data. The default is 30.
+    retries : int, optional
+        The number of retries of a failing request (see make_session). The default is 3.
+    session : requests.Session, optional
+        The session used to send the requests; a pooled one is created if None.
+    skip_existing : bool, optional
+        Whether to skip the files that are already downloaded and valid (see verify_file). The default is True.
+
+    Returns
+    -------
+    dict
+        A dictionary whose keys are the names of the files that were not downloaded and values are the corresponding errors.
+
+    Notes
+    -----
+    This function does not raise any exceptions for a failing file; its partial `.tmp` file is kept, so that a later call resumes it (see download_file).
+    Downloaded files that do not match the size or checksum of their manifest entry are removed and reported as failing. Checksums are recorded in the
+    .verified.json file of download_path, so that unchanged files are not hashed again by later calls.
+    """
+    os.makedirs(download_path, exist_ok=True)
+    session = session if session is not None else make_session(n_workers, retries)
+    limiter = RateLimiter(delay)
+    verified = _read_verified(download_path)
+
+    def fetch(key):
+        file_path = os.path.join(download_path, key)
+        if skip_existing and verify_file(file_path, files[key], verified):
+            print(f"Skipping: {key}")
+            return
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+        print(f"Downloading: {key}")
+        download_file(_entry(files[key])["url"], file_path, session, chunk_size, timeout, limiter)
+        if not verify_file(file_path, files[key], verified):
+            os.remove(file_path)
+            raise IOError("The downloaded file does not match its size or checksum")
+        print(f"Downloaded: {key}")
+
+    errors = {}
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        futures = {executor.submit(fetch, key): key for key in files}
+        for future in as_completed(futures):
+            key = futures[future]
+            if future.exception() is not None:
+                print(f"Error downloading {key}: {future.exception()}")
+                errors[key] = future.exception()
+
+    if verified:
+        _write_verified(download_path, verified)
+    return errors
+
+
 class ZipDatasetDownloader:
     def __init__(self, url):
         """
@@ -22,8 +324,8 @@ class ZipDatasetDownloader:
 
 		Parameters
         ----------
-        url : str
-			The URL of the dataset zip file.
+        url : str or dict
+			The URL of the dataset zip file, or its manifest entry (see read_addresses).
             
         Attributes
         ----------
@@ -36,7 +338,7 @@ class ZipDatasetDownloader:
         """
         self.url = url
 
-    def download(self, download_file_name):
+    def download(self, download_file_name, chunk_size=2**20, timeout=30, skip_existing=True):
         """
         Downloads the dataset from the source URL into the specified file.
         
@@ -44,13 +346,24 @@ class ZipDatasetDownloader:
 		----------
 		download_file_name : str
 			The file path where the dataset will be downloaded.
+		chunk_size : int, optional
+			The size of the chunks written to the file, in bytes. The default is 1 MiB.
+		timeout : float, optional
+			The maximum number of seconds to wait for the server to connect or send data. The default is 30.
+		skip_existing : bool, optional
+			Whether to skip the download if the file already exists and is valid (see verify_file). The default is True.
+
+		Notes
+		-----
+		The archive is streamed to disk rather than held in memory, and an interrupted download is resumed by the next call (see download_file).
         """
         self.download_file_name = download_file_name
-        response = requests.get(self.url)
-        with open(self.download_file_name, "wb") as file:
-            file.write(response.content)
+        download_path, file_name = os.path.split(self.download_file_name)
+        errors = download_files({file_name: self.url}, download_path or ".", 1, chunk_size, timeout=timeout, skip_existing=skip_existing)
+        if errors:
+            raise errors[file_name]
 
-    def extract(self, extraction_path):
+    def extract(self, extraction_path, members=None):
         """
         Extracts the dataset from the downloaded zip file to the specified path.
 
@@ -58,10 +371,15 @@ class ZipDatasetDownloader:
 		----------
 		extraction_path : str
             The directory path where the dataset will be extracted.
+		members : callable or list of str, optional
+			The members of the archive to extract, as a predicate of their names or a list of shell-style patterns (e.g. ['*H_*.csv']); all of them if None (default).
+
+		Notes
+		-----
+		Digestors can also read the dataset straight from the downloaded archive, without extracting it, by passing its path as their base directory (e.g. UoO('UoO.zip/')).
         """
         self.extraction_path = extraction_path
-        with ZipFile(self.download_file_name, "r") as zObject:
-            zObject.extractall(self.extraction_path)
+        extract_archive(self.download_file_name, self.extraction_path, members)
 
     def download_extract(self, download_file_name, extraction_path):
         """
@@ -86,19 +404,19 @@ class CwruDownloader:
         Parameters
         ----------
         files : dict
-            A dictionary where keys are file names and values are the download links.
+            A dictionary where keys are file names and values are the download links or manifest entries (see read_addresses).
 
         Attributes
         ----------
         files : dict
-            A dictionary where keys are file names and values are the download links.
+            A dictionary where keys are file names and values are the download links or manifest entries (see read_addresses).
         undownloaded : dict
             A dictionary whose keys are file names and values are the corresponding errors. This is used to keep track of the files that are not downloaded properly.
         """
         self.files = files
         self.undownloaded = {}
 
-    def download(self, download_path, chunk_size=512, delay=1):
+    def download(self, download_path, chunk_size=2**20, delay=0.2, n_workers=4, timeout=30, skip_existing=True):
         """
         Downloads the dataset from the source URLs into the specified directory.
 
@@ -107,92 +425,45 @@ class CwruDownloader:
         download_path : str
             The directory path where the dataset will be downloaded.
         chunk_size : int, optional
-            The size of the chunks to write to the file, in bytes. The default is 512.
+            The size of the chunks to write to the file, in bytes. The default is 1 MiB.
         delay : float, optional
-            The delay between the requests to the server, in seconds. The default is 1.
+            The minimum time between the starts of two requests to the server, in seconds. The default is 0.2.
+        n_workers : int, optional
+            The number of files downloaded at the same time. The default is 4.
+        timeout : float, optional
+            The maximum number of seconds to wait for the server to connect or send data. The default is 30.
+        skip_existing : bool, optional
+            Whether to skip the files that are already downloaded and valid (see verify_file). The default is True.
 
         Notes
         -----
-        This method does not raise any exceptions. Instead, it logs the errors and stores them in the undownloaded attribute.
+        This method does not raise any exceptions. Instead, it logs the errors and stores them in the undownloaded attribute. Partially downloaded files are resumed by redownload().
         """
         self.download_path = download_path
-        if not os.path.exists(self.download_path):
-            os.makedirs(self.download_path)
-
-        for key in self.files:
-            print(f"Downloading: {key}")
-            try:
-                response = requests.get(self.files[key], stream=True)
-                if response.status_code == 200:
-                    temp_file_path = os.path.join(
-                        self.download_path, key.split(".")[0] + ".tmp"
-                    )
-
-                    with open(temp_file_path, mode="wb") as file:
-                        for chunk in response.iter_content(chunk_size=chunk_size):
-                            if chunk:
-                                file.write(chunk)
-
-                    os.rename(temp_file_path, os.path.join(self.download_path, key))
-                    print(f"Downloaded: {key}")
-                else:
-                    print(
-                        f"Error downloading {key}: Response status {response.status_code}"
-                    )
-                    self.undownloaded[key] = self.files[key]
-                    os.remove(temp_file_path)
-
-            except Exception as e:
-                print(f"Error downloading {key}: {e}")
-                self.undownloaded[key] = self.files[key]
-                os.remove(temp_file_path)
-
-            time.sleep(delay)
-
-    def redownload(self, chunk_size=512, delay=1):
+        errors = download_files(self.files, self.download_path, n_workers, chunk_size, delay, timeout, skip_existing=skip_existing)
+        self.undownloaded = {key: self.files[key] for key in self.files if key in errors}
+
+    def redownload(self, chunk_size=2**20, delay=0.2, n_workers=4, timeout=30):
         """
         Redownloads the files that were not downloaded properly.
 
         Parameters
         ----------
         chunk_size : int, optional
-            The size of the chunks to write to the file, in bytes. The default is 512.
+            The size of the chunks to write to the file, in bytes. The default is 1 MiB.
         delay : float, optional
-            The delay between the requests to the server, in seconds. The default is 1.
+            The minimum time between the starts of two requests to the server, in seconds. The default is 0.2.
+        n_workers : int, optional
+            The number of files downloaded at the same time. The default is 4.
+        timeout : float, optional
+            The maximum number of seconds to wait for the server to connect or send data. The default is 30.
 
         Notes
         -----
         This method does not raise any exceptions. Instead, it logs the errors and stores them in the undownloaded attribute.
         """
-        for key in list(self.undownloaded.keys()):
-            print(f"Downloading: {key}")
-            try:
-                response = requests.get(self.files[key], stream=True)
-                if response.status_code == 200:
-                    temp_file_path = os.path.join(
-                        self.download_path, key.split(".")[0] + ".tmp"
-                    )
-
-                    with open(temp_file_path, mode="wb") as file:
-                        for chunk in response.iter_content(chunk_size=chunk_size):
-                            if chunk:
-                                file.write(chunk)
-
-                    os.rename(temp_file_path, os.path.join(self.download_path, key))
-                    self.undownloaded.pop(key)
-                    print(f"Downloaded: {key}")
-
-                else:
-                    print(
-                        f"Error downloading {key}: Response status {response.status_code}"
-                    )
-                    os.remove(temp_file_path)
-
-            except Exception as e:
-                print(f"Error downloading {key}: {e}")
-                os.remove(temp_file_path)
-
-            time.sleep(delay)
+        errors = download_files(self.undownloaded, self.download_path, n_workers, chunk_size, delay, timeout)
+        self.undownloaded = {key: self.files[key] for key in self.undownloaded if key in errors}
 
 
 class PuDownloader:
@@ -203,11 +474,11 @@ class PuDownloader:
 		Parameters
 		----------
 		files : dict
-			A dictionary where keys are file names and values are the download links.
+			A dictionary whose keys are the dataset's categories and values are dictionaries of file names and download links or manifest entries (see read_addresses).
 		"""
         self.files = files
 
-    def download(self, download_path, timeout=10):
+    def download(self, download_path, timeout=10, n_workers=4, chunk_size=2**20, delay=0, skip_existing=True):
         """
 		Downloads the dataset files from the specified URLs into the given directory.
 
@@ -216,23 +487,30 @@ class PuDownloader:
 		download_path : str
 			The directory where the downloaded files will be saved.
 		timeout : int, optional
-			The maximum number of seconds to wait for a download to complete. The default is 10 seconds.
+			The maximum number of seconds to wait for the server to connect or send data. The default is 10 seconds.
+		n_workers : int, optional
+			The number of files downloaded at the same time. The default is 4.
+		chunk_size : int, optional
+			The size of the chunks written to the files, in bytes. The default is 1 MiB.
+		delay : float, optional
+			The minimum time between the starts of two requests to the server, in seconds. The default is 0.
+		skip_existing : bool, optional
+			Whether to skip the files that are already downloaded and valid (see verify_file). The default is True.
+
+		Returns
+		-------
+		dict
+			A dictionary whose keys are the names of the files that were not downloaded and values are the corresponding errors; calling this method again resumes them.
 
 		Notes
 		-----
 		If the specified directory does not exist, it will be created. This method prints the file names as they are downloaded.
 		"""
         self.download_path = download_path
-        if not os.path.exists(self.download_path):
-            os.mkdir(self.download_path)
-        for key in self.files.keys():
-            for subkey in self.files[key].keys():
-                print("Downloading: ", subkey)
-                r = requests.get(self.files[key][subkey], stream=True, timeout=timeout)
-                with open(self.download_path + subkey, "wb") as f:
-                    f.write(r.content)
+        files = {subkey: self.files[key][subkey] for key in self.files for subkey in self.files[key]}
+        return download_files(files, self.download_path, n_workers, chunk_size, delay, timeout, skip_existing=skip_existing)
 
-    def extract(self, extraction_path):
+    def extract(self, extraction_path, members=None, n_workers=4):
         """
         Extracts the dataset files from the downloaded rar files to the specified path.
 
@@ -240,15 +518,21 @@ class PuDownloader:
         ----------
         extraction_path : str
             The directory path where the dataset will be extracted.
+        members : callable or list of str, optional
+            The members of the archives to extract, as a predicate of their names or a list of shell-style patterns; e.g. ['K001/*_1.mat', 'K001/*_2.mat'] extracts
+            the first two repetitions of the K001 folder only. All of them are extracted if None (default).
+        n_workers : int, optional
+            The number of archives extracted at the same time. The default is 4.
+
+        Notes
+        -----
+        The PU digestor can also read the dataset straight from the downloaded archives, without extracting them, by passing the download directory as its base directory.
         """
         self.extraction_path = extraction_path
-        for key in self.files.keys():
-            for subkey in self.files[key]:
-                print("Extracting: ", subkey)
-                with RarFile(self.download_path + subkey) as file:
-                    file.extractall(self.extraction_path)
+        archives = [os.path.join(self.download_path, subkey) for key in self.files for subkey in self.files[key]]
+        extract_archives(archives, self.extraction_path, members, n_workers)
 
-    def download_extract(self, download_path, extraction_path, timeout=10):
+    def download_extract(self, download_path, extraction_path, timeout=10, n_workers=4):
 
         """
         Downloads the dataset files from the specified URLs into the given directory and extracts them into another directory.
@@ -260,13 +544,15 @@ class PuDownloader:
         extraction_path : str
             The directory path where the dataset will be extracted.
         timeout : int, optional
-            The maximum number of seconds to wait for a download to complete. The default is 10 seconds.
+            The maximum number of seconds to wait for the server to connect or send data. The default is 10 seconds.
+        n_workers : int, optional
+            The number of files downloaded at the same time. The default is 4.
 
         Notes
         -----
         If the specified directories do not exist, they will be created. This method prints the file names as they are downloaded and extracted.
         """
-        self.download(download_path, timeout)
+        self.download(download_path, timeout, n_workers)
         self.extract(extraction_path)
 
 
@@ -278,11 +564,11 @@ class MaFaulDaDownloader:
         Parameters
         ----------
         files : dict of str
-            A dictionary whose keys are file names and corresponding values are the download links.
+            A dictionary whose keys are file names and corresponding values are the download links or manifest entries (see read_addresses).
         """
         self.files = files
 
-    def download(self, download_path):
+    def download(self, download_path, n_workers=4, chunk_size=2**20, delay=0, timeout=30, skip_existing=True):
         """
         Downloads the dataset files from the specified URLs into the given directory.
 
@@ -290,21 +576,30 @@ class MaFaulDaDownloader:
         ----------
         download_path : str
             The directory where the downloaded files will be saved.
+        n_workers : int, optional
+            The number of files downloaded at the same time. The default is 4.
+        chunk_size : int, optional
+            The size of the chunks written to the files, in bytes. The default is 1 MiB.
+        delay : float, optional
+            The minimum time between the starts of two requests to the server, in seconds. The default is 0.
+        timeout : float, optional
+            The maximum number of seconds to wait for the server to connect or send data. The default is 30.
+        skip_existing : bool, optional
+            Whether to skip the files that are already downloaded and valid (see verify_file). The default is True.
+
+        Returns
+        -------
+        dict
+            A dictionary whose keys are the names of the files that were not downloaded and values are the corresponding errors; calling this method again resumes them.
 
         Notes
         -----
         If the specified directory does not exist, it will be created. This method prints the file names as they are downloaded.
         """
         self.download_path = download_path
-        if not os.path.exists(self.download_path):
-            os.mkdir(self.download_path)
-        for key in self.files:
-            print("Downloading: ", key)
-            r = requests.get(self.files[key], stream=True)
-            with open(self.download_path + key, "wb") as f:
-                f.write(r.content)
+        return download_files(self.files, self.download_path, n_workers, chunk_size, delay, timeout, skip_existing=skip_existing)
 
-    def extract(self, extraction_path):
+    def extract(self, extraction_path, members=None, n_workers=4):
         """
         Extracts the dataset files from the downloaded zip files into the specified directory.
 
@@ -312,24 +607,27 @@ class MaFaulDaDownloader:
         ----------
         extraction_path : str
             The directory where the extracted files will be saved.
+        members : callable or list of str, optional
+            The members of the archives to extract, as a predicate of their names or a list of shell-style patterns; e.g. ['normal/*', 'imbalance/10g/*'] extracts
+            the normal folder and the 10g severity of the imbalance folder only. All of them are extracted if None (default).
+        n_workers : int, optional
+            The number of archives extracted at the same time. The default is 4.
 
         Notes
         -----
-        If the specified directory does not exist, it will be created. This method prints the file names as they are extracted.
+        If the specified directory does not exist, it will be created. This method prints the file names as they are extracted. The MaFauldDa digestor can also read
+        the dataset straight from the downloaded archives, without extracting them, by passing the download directory as its base directory.
         """
         self.extraction_path = extraction_path
         if not os.path.exists(self.download_path):
             os.mkdir(self.download_path)
 
         zip_files = [
-            file for file in os.listdir(self.download_path) if file.endswith(".zip")
+            os.path.join(self.download_path, file) for file in os.listdir(self.download_path) if file.endswith(".zip")
         ]
-        for zip_file in zip_files:
-            print("Extracting: ", zip_file)
-            with ZipFile(self.download_path + zip_file, "r") as zObject:
-                zObject.extractall(self.extraction_path)
+        extract_archives(zip_files, self.extraction_path, members, n_workers)
 
-    def download_extract(self, download_path, extraction_path):
+    def download_extract(self, download_path, extraction_path, n_workers=4):
 
         """
         Downloads the dataset files from the specified URLs into the given directory and extracts them into another directory.
@@ -340,10 +638,12 @@ class MaFaulDaDownloader:
             The directory where the downloaded files will be saved.
         extraction_path : str
             The directory path where the dataset will be extracted.
+        n_workers : int, optional
+            The number of files downloaded at the same time. The default is 4.
 
         Notes
         -----
         If the specified directories do not exist, they will be created. This method prints the file names as they are downloaded and extracted.
         """
-        self.download(download_path)
+        self.download(download_path, n_workers)
         self.extract(extraction_path)
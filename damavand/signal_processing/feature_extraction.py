@@ -1,3 +1,5 @@
+import math
+import warnings
 import pandas as pd
 import numpy as np
 
@@ -20,33 +22,91 @@ def feature_extractor(signals, features):
 
     Return Value:
     A pd.DataFrame() containing the feature values for each signal
+
+    Descriptions:
+    Built-in features of this module (rms, smsa, peak, crest_factor, clearance_factor, shape_factor, impulse_factor,
+    spectral_centroid and P17-P24) are evaluated at once over the whole block of signals, as row-wise NumPy reductions
+    sharing their intermediate quantities (see FeaturePlan); any other function is applied to the signals one row
+    (pd.Series) at a time. Either way, missing (NaN) samples are skipped, as by the reductions of pd.Series.
+    """
+    return FeaturePlan(features).compute(signals)
+
+
+class FeaturePlan:
+    """
+    FeaturePlan(features, chunk_size = 4096) - Resolving the intermediate quantities shared by a set of features
+
+    Arguments:
+    features -- A python dict of features, in the same format as the one accepted by feature_extractor()
+    chunk_size -- Number of signals (rows) processed at once; bounds the memory of the temporaries
+
+    Attributes:
+    intermediates -- A dict whose keys are the indices of the distinct frequency axes (None for the time domain)
+                     and values are the sets of intermediate quantities needed by the requested features
+
+    Descriptions:
+    Built-in features of this module are expressed in terms of a few shared intermediates: mean|x|, mean(x^2),
+    max|x| and mean(sqrt|x|) in the time domain, and the spectral moments sum(f^k * S) of order 0-4 together with
+    the moments around the spectral centroid in the frequency domain. The plan resolves which intermediates the
+    requested features depend on and computes each of them exactly once per chunk of signals, so that e.g.
+    crest_factor reuses peak and rms, and P21-P24 reuse the spectral centroid and P17. Any other function is
+    applied to the signals one row (pd.Series) at a time.
     """
-    def apply_feature(row, func_tuple):
+    def __init__(self, features, chunk_size = 4096):
+        self.features = features
+        self.chunk_size = chunk_size
+        self.freq_axes = []
+        self.intermediates = {}
+        self.recipes = {}
+        self.fallbacks = {}
+
+        for name, (func, args, kwargs) in features.items():
+            recipe = _feature_recipes.get(func)
+            if recipe is not None and recipe[0] is None and not args and not kwargs:
+                group = None
+            elif recipe is not None and recipe[0] == 'spectral' and (len(args), set(kwargs)) in [(1, set()), (0, {'freq_axis'})]:
+                group = self._freq_axis_group(args[0] if args else kwargs['freq_axis'])
+            else:
+                self.fallbacks[name] = (func, args, kwargs)
+                continue
+
+            self.intermediates.setdefault(group, set()).update(_resolve_intermediates(recipe[1]))
+            self.recipes[name] = (group, recipe[2])
+
+    def _freq_axis_group(self, freq_axis):
+        for group, known_axis in enumerate(self.freq_axes):
+            if known_axis is freq_axis:
+                return group
+        self.freq_axes.append(freq_axis)
+        return len(self.freq_axes) - 1
+
+    def compute(self, signals):
         """
-        apply_feature(row, func_tuple) - Applies a feature extraction function to a given row.
+        compute(signals) - Computing the planned features over a set of signals
 
         Arguments:
-        row -- A pd.Series() including a signal
-        func_tuple -- A tuple of (function, args, kwargs) where:
-                        * function: the feature extraction function
-                        * args: tuple of positional arguments (optional)
-                        * kwargs: dict of keyword arguments (optional)
+        signals -- A pd.DataFrame() including signals in its rows
 
         Return Value:
-        The result of the feature extraction function when applied to the given row
+        A pd.DataFrame() containing the feature values for each signal
         """
-        func, args, kwargs = func_tuple
-        return func(row, *args, **kwargs)
+        # the signals are converted to float64 one chunk at a time, so that e.g. float32 signals are never copied whole
+        block = signals.to_numpy()
+
+        feature_values = {name: np.empty(block.shape[0]) for name in self.recipes}
+        for start in range(0, block.shape[0], self.chunk_size):
+            chunk = np.asarray(block[start : start + self.chunk_size], dtype = float)
+            values = {
+                group: _time_intermediates(chunk, needs) if group is None else _spectral_intermediates(chunk, np.asarray(self.freq_axes[group], dtype = float), needs)
+                for group, needs in self.intermediates.items()
+            }
+            for name, (group, finalize) in self.recipes.items():
+                feature_values[name][start : start + self.chunk_size] = finalize(values[group])
 
-    feature_values = signals.apply(
-        lambda row: pd.Series([
-            apply_feature(row, feat_info) for feat_info in features.values()
-        ]),
-        axis=1
-    )
-    feature_values.columns = features.keys()
-    
-    return feature_values
+        for name, (func, args, kwargs) in self.fallbacks.items():
+            feature_values[name] = signals.apply(lambda row: func(row, *args, **kwargs), axis = 1).to_numpy()
+
+        return pd.DataFrame(feature_values, index = signals.index, columns = list(self.features.keys()))
 
 
 # Time domain signals
@@ -99,4 +159,282 @@ def P23(spectrum, freq_axis):
     return np.mean(np.power(np.subtract(freq_axis, spectral_centroid(spectrum, freq_axis)), 4) * spectrum) / np.power(P17(spectrum, freq_axis), 4)
 
 def P24(spectrum, freq_axis):
-    return np.mean(np.sqrt(np.subtract(freq_axis, spectral_centroid(spectrum, freq_axis))) * spectrum) / np.sqrt(P17(spectrum, freq_axis))
\ No newline at end of file
+    return np.mean(np.sqrt(np.subtract(freq_axis, spectral_centroid(spectrum, freq_axis))) * spectrum) / np.sqrt(P17(spectrum, freq_axis))
+
+
+# Shared intermediates of the built-in features, computed over a 2-D chunk of signals (one signal per row)
+
+_intermediate_dependencies = {
+    'central_2': {'moment_0', 'moment_1'},
+    'central_3': {'moment_0', 'moment_1'},
+    'central_4': {'moment_0', 'moment_1'},
+    'sqrt_deviation_mean': {'moment_0', 'moment_1'},
+}
+
+def _resolve_intermediates(needs):
+    resolved = set()
+    pending = list(needs)
+    while pending:
+        need = pending.pop()
+        if need not in resolved:
+            resolved.add(need)
+            pending.extend(_intermediate_dependencies.get(need, ()))
+    return resolved
+
+def _reductions(chunk):
+    # like pd.Series reductions in the per-row path, missing (NaN) samples are skipped; the NaN-aware reductions are only used when needed
+    if np.isnan(chunk).any():
+        return np.nanmean, np.nanmax
+    return np.mean, np.max
+
+def _time_intermediates(chunk, needs):
+    mean, maximum = _reductions(chunk)
+    values = {}
+    with warnings.catch_warnings():
+        # signals with no sample at all give NaN, without warning, as in the per-row path
+        warnings.simplefilter('ignore', RuntimeWarning)
+        if 'sq_mean' in needs:
+            values['sq_mean'] = mean(np.square(chunk), axis = 1)
+
+        if needs & {'abs_mean', 'abs_max', 'sqrt_abs_mean'}:
+            magnitude = np.abs(chunk)
+            if 'abs_mean' in needs:
+                values['abs_mean'] = mean(magnitude, axis = 1)
+            if 'abs_max' in needs:
+                values['abs_max'] = maximum(magnitude, axis = 1)
+            if 'sqrt_abs_mean' in needs:
+                values['sqrt_abs_mean'] = mean(np.sqrt(magnitude, out = magnitude), axis = 1)
+
+    return values
+
+def _spectral_intermediates(spectrum, freq_axis, needs):
+    mean, _ = _reductions(spectrum)
+    orders = sorted(int(need.split('_')[1]) for need in needs if need.startswith('moment_'))
+    # missing bins add nothing to the moments, as in a skipna sum
+    moments = (np.where(np.isnan(spectrum), 0, spectrum) if mean is np.nanmean else spectrum) @ np.power.outer(freq_axis, orders)
+    values = {'moment_%d' % order: moments[:, i] for i, order in enumerate(orders)}
+
+    if needs & {'central_2', 'central_3', 'central_4', 'sqrt_deviation_mean'}:
+        deviation = np.subtract(freq_axis, (values['moment_1'] / values['moment_0'])[:, None])
+        squared_deviation = np.square(deviation)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            if 'central_2' in needs:
+                values['central_2'] = mean(squared_deviation * spectrum, axis = 1)
+            if 'central_3' in needs:
+                values['central_3'] = mean(squared_deviation * deviation * spectrum, axis = 1)
+            if 'central_4' in needs:
+                values['central_4'] = mean(np.square(squared_deviation) * spectrum, axis = 1)
+            if 'sqrt_deviation_mean' in needs:
+                # bins below the centroid have no real square root; like pd.Series.mean() in the per-row path, they are skipped
+                with np.errstate(invalid = 'ignore'):
+                    values['sqrt_deviation_mean'] = np.nanmean(np.sqrt(deviation) * spectrum, axis = 1)
+
+    return values
+
+# Built-in features as (domain, intermediates, finalizer); the finalizer maps the intermediates of a chunk to the feature values
+
+_feature_recipes = {
+    smsa: (None, {'sqrt_abs_mean'}, lambda m: np.square(m['sqrt_abs_mean'])),
+    rms: (None, {'sq_mean'}, lambda m: np.sqrt(m['sq_mean'])),
+    peak: (None, {'abs_max'}, lambda m: m['abs_max']),
+    crest_factor: (None, {'abs_max', 'sq_mean'}, lambda m: m['abs_max'] / np.sqrt(m['sq_mean'])),
+    clearance_factor: (None, {'abs_max', 'sqrt_abs_mean'}, lambda m: m['abs_max'] / np.square(m['sqrt_abs_mean'])),
+    shape_factor: (None, {'sq_mean', 'abs_mean'}, lambda m: np.sqrt(m['sq_mean']) / m['abs_mean']),
+    impulse_factor: (None, {'abs_max', 'abs_mean'}, lambda m: m['abs_max'] / m['abs_mean']),
+    spectral_centroid: ('spectral', {'moment_0', 'moment_1'}, lambda m: m['moment_1'] / m['moment_0']),
+    P17: ('spectral', {'central_2'}, lambda m: np.sqrt(m['central_2'])),
+    P18: ('spectral', {'moment_0', 'moment_2'}, lambda m: np.sqrt(m['moment_2'] / m['moment_0'])),
+    P19: ('spectral', {'moment_2', 'moment_4'}, lambda m: m['moment_4'] / m['moment_2']),
+    P20: ('spectral', {'moment_0', 'moment_2', 'moment_4'}, lambda m: m['moment_2'] / np.sqrt(m['moment_0'] * m['moment_4'])),
+    P21: ('spectral', {'central_2', 'moment_0', 'moment_1'}, lambda m: np.sqrt(m['central_2']) / (m['moment_1'] / m['moment_0'])),
+    P22: ('spectral', {'central_2', 'central_3'}, lambda m: m['central_3'] / np.power(m['central_2'], 1.5)),
+    P23: ('spectral', {'central_2', 'central_4'}, lambda m: m['central_4'] / np.square(m['central_2'])),
+    P24: ('spectral', {'central_2', 'sqrt_deviation_mean'}, lambda m: m['sqrt_deviation_mean'] / np.power(m['central_2'], 0.25)),
+}
+
+
+# Streaming extraction
+
+# sample-wise terms of the window sums
+_summed_intermediates = {
+    'abs_mean': lambda samples, magnitude: magnitude,
+    'sq_mean': lambda samples, magnitude: np.square(samples),
+    'sqrt_abs_mean': lambda samples, magnitude: np.sqrt(magnitude),
+}
+
+def _segment_maxima(values, start, segment_len, carry):
+    # running maxima of values, restarted at every segment of segment_len blocks of the stream; values start at block
+    # `start`, and carry is the running maximum of the blocks before them in the same segment
+    maxima = np.empty_like(values)
+    head = min(len(values), -start % segment_len)
+    maxima[:head] = np.maximum(np.maximum.accumulate(values[:head]), carry)
+    tail = head + (len(values) - head) // segment_len * segment_len
+    maxima[head:tail] = np.maximum.accumulate(values[head:tail].reshape(-1, segment_len), axis = 1).ravel()
+    maxima[tail:] = np.maximum.accumulate(values[tail:])
+    return maxima
+
+class StreamingFeatures:
+    """
+    StreamingFeatures(features, win_len, hop_len) - Online extraction of time domain features from a continuous stream of samples
+
+    Arguments:
+    features -- A python dict of features, in the same format as the one accepted by feature_extractor(); only the built-in
+                time domain features (rms, smsa, peak, crest_factor, clearance_factor, shape_factor and impulse_factor),
+                without arguments, are supported
+    win_len -- Length of the windows the features are extracted from
+    hop_len -- Number of samples between the starts of two consecutive windows
+
+    Descriptions:
+    Samples are fed chunk by chunk, of any size, through update() (or flow()), which returns the features of every window
+    completed by the chunk; windows start every hop_len samples from the first sample of the stream, like the ones of
+    damavand.utils.splitter(), so that the rows equal the ones of feature_extractor() over the split stream. The stream is
+    cut into blocks of gcd(win_len, hop_len) samples, each summarized once by its sums of |x|, x^2 and sqrt|x| and by its
+    maximum |x|: window sums are differences of running (prefix) sums over the blocks, and window maxima are the larger of
+    two running maxima of the block maxima, one backward and one forward, restarted every window length (van Herk /
+    Gil-Werman), so that each new hop costs O(hop_len) instead of O(win_len), in vectorized NumPy operations. Only the
+    blocks of the current window are retained, in buffers growing as needed, and prefix sums are recomputed from them
+    whenever old blocks are dropped, so that rounding errors do not build up over long streams.
+    """
+    def __init__(self, features, win_len, hop_len):
+        self.features = features
+        self.win_len = win_len
+        self.hop_len = hop_len
+        self.block_len = math.gcd(win_len, hop_len)
+        self.window_blocks = win_len // self.block_len
+        self.hop_blocks = hop_len // self.block_len
+
+        self.recipes = {}
+        needs = set()
+        for name, (func, args, kwargs) in features.items():
+            recipe = _feature_recipes.get(func)
+            if recipe is None or recipe[0] is not None or args or kwargs:
+                raise ValueError(f'{name!r} is not a built-in time domain feature, so it can not be extracted from a stream.')
+            needs.update(recipe[1])
+            self.recipes[name] = recipe[2]
+        self.summed = [need for need in _summed_intermediates if need in needs]
+        self.maximum = 'abs_max' in needs
+
+        self.reset()
+
+    def reset(self):
+        """
+        reset() - Discarding the samples fed so far, to start a new stream
+        """
+        self._pending = np.empty(0)
+        self._base = 0                      # index (in the stream) of the first retained block
+        self._n_blocks = 0                  # number of blocks fed so far
+        self._next_end = self.window_blocks # block index where the next window ends
+        self._n_windows = 0
+        # buffers of the retained blocks, of which the first self._n_blocks - self._base rows are in use
+        capacity = 2 * self.window_blocks
+        self._block_sums = np.empty((capacity, len(self.summed)))
+        self._prefix_sums = np.zeros((capacity + 1, len(self.summed)))
+        self._block_maxima = np.empty(capacity)
+        self._forward_maxima = np.empty(capacity)  # maxima since the start of the window-long segment of each block
+        self._backward_maxima = np.empty(capacity) # maxima up to the end of it, once the segment is complete
+
+    def update(self, chunk, return_df = True):
+        """
+        update(chunk, return_df) - Feeding the next samples of the stream
+
+        Arguments:
+        chunk -- A 1-D np.array() (or any array-like) of the next samples
+        return_df -- Whether to return a pd.DataFrame() (default) or a 2-D np.array(), cheaper for small chunks
+
+        Return Value:
+        A pd.DataFrame() containing the feature values of each window completed by the chunk (possibly none), indexed by
+        the position of the windows in the stream; or a np.array() of these values, with one column per feature
+        """
+        samples = np.concatenate([self._pending, np.ravel(np.asarray(chunk, dtype = float))])
+        n_new = len(samples) // self.block_len
+        self._pending = samples[n_new * self.block_len:]
+        samples = samples[:n_new * self.block_len]
+
+        self._reserve(n_new)
+        start, stop = self._n_blocks - self._base, self._n_blocks - self._base + n_new
+        magnitude = np.abs(samples)
+        if self.summed:
+            # sums over the blocks of the chunk, as differences of running sums over its samples, cheaper than row sums of short blocks
+            terms = np.empty((len(self.summed), len(samples)))
+            for i, need in enumerate(self.summed):
+                terms[i] = _summed_intermediates[need](samples, magnitude)
+            chunk_sums = np.cumsum(terms, axis = 1)[:, self.block_len - 1::self.block_len].T
+            block_sums = self._block_sums[start:stop]
+            block_sums[:1] = chunk_sums[:1]
+            np.subtract(chunk_sums[1:], chunk_sums[:-1], out = block_sums[1:])
+            np.add(self._prefix_sums[start], chunk_sums, out = self._prefix_sums[start + 1:stop + 1])
+        if self.maximum:
+            self._push_maxima(magnitude.reshape(n_new, self.block_len).max(axis = 1))
+        self._n_blocks += n_new
+
+        ends = np.arange(self._next_end, self._n_blocks + 1, self.hop_blocks) - self._base
+        starts = ends - self.window_blocks
+        values = {}
+        for i, need in enumerate(self.summed):
+            values[need] = (self._prefix_sums[ends, i] - self._prefix_sums[starts, i]) / self.win_len
+        if self.maximum:
+            values['abs_max'] = np.maximum(self._backward_maxima[starts], self._forward_maxima[ends - 1])
+
+        feature_values = np.empty((len(ends), len(self.recipes)))
+        for i, finalize in enumerate(self.recipes.values()):
+            feature_values[:, i] = finalize(values)
+
+        first_window = self._n_windows
+        self._n_windows += len(ends)
+        self._next_end += len(ends) * self.hop_blocks
+        self._compact()
+
+        if return_df:
+            return pd.DataFrame(feature_values, index = pd.RangeIndex(first_window, self._n_windows), columns = list(self.recipes))
+        return feature_values
+
+    def flow(self, chunks, return_df = True):
+        """
+        flow(chunks, return_df) - Lazily feeding a stream of chunks (e.g. the readings of a sensor), yielding the result of update() for each of them
+        """
+        for chunk in chunks:
+            yield self.update(chunk, return_df)
+
+    def _reserve(self, n_new):
+        # grow the buffers, geometrically, to hold n_new more blocks
+        n_retained = self._n_blocks - self._base
+        capacity = len(self._block_maxima)
+        if n_retained + n_new <= capacity:
+            return
+        grown_capacity = max(n_retained + n_new, 2 * capacity)
+        for name in ('_block_sums', '_prefix_sums', '_block_maxima', '_forward_maxima', '_backward_maxima'):
+            buffer = getattr(self, name)
+            # the prefix sums have one more row, for the empty prefix
+            grown = np.empty((grown_capacity + len(buffer) - capacity,) + buffer.shape[1:])
+            grown[:len(buffer)] = buffer
+            setattr(self, name, grown)
+
+    def _push_maxima(self, block_maxima):
+        # a window of window_blocks blocks spans at most two segments of window_blocks blocks: its maximum is the larger of
+        # the backward maximum of its first block, over the end of the first segment, and of the forward maximum of its
+        # last block, over the start of the second one
+        segment_len = self.window_blocks
+        start = self._n_blocks - self._base
+        stop = start + len(block_maxima)
+        self._block_maxima[start:stop] = block_maxima
+        carry = self._forward_maxima[start - 1] if start else -np.inf
+        self._forward_maxima[start:stop] = _segment_maxima(block_maxima, self._n_blocks, segment_len, carry)
+
+        # backward maxima of the segments completed by these blocks, from their first retained block
+        first = max(self._n_blocks // segment_len * segment_len, self._base) - self._base
+        last = (self._n_blocks + len(block_maxima)) // segment_len * segment_len - self._base
+        if last > first:
+            self._backward_maxima[first:last] = _segment_maxima(self._block_maxima[first:last][::-1], 0, segment_len, -np.inf)[::-1]
+
+    def _compact(self):
+        # drop the blocks no window needs anymore, once they outnumber a window, and recompute the prefix sums of the rest
+        start = min(self._next_end - self.window_blocks, self._n_blocks)
+        drop = start - self._base
+        if drop < self.window_blocks:
+            return
+        n_retained = self._n_blocks - start
+        for buffer in (self._block_sums, self._block_maxima, self._forward_maxima, self._backward_maxima):
+            buffer[:n_retained] = buffer[drop:drop + n_retained]
+        np.cumsum(self._block_sums[:n_retained], axis = 0, out = self._prefix_sums[1:n_retained + 1])
+        self._base = start
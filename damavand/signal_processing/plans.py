@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import scipy
+
+PlanCacheInfo = namedtuple('PlanCacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+class PlanCache:
+	"""
+	PlanCache(maxsize) - A thread-safe least-recently-used registry of precomputed transform plans
+
+	Arguments:
+	maxsize -- Maximum number of plans kept in the registry; the least recently used plan is evicted first. Defaults to 128.
+
+	Descriptions:
+	Plans (e.g. scipy.signal.ZoomFFT objects, windows and SOS filters) are stored under hashable keys describing their
+	parameters, so that repeated calls with identical parameters reuse the precomputed chirps, windows and filter
+	coefficients instead of rebuilding them. Arrays stored in the registry are made read-only, as they are shared
+	between callers.
+	"""
+	def __init__(self, maxsize = 128):
+		self.maxsize = maxsize
+		self.hits = 0
+		self.misses = 0
+		self._plans = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key, factory):
+		"""
+		get(key, factory) - Returning the plan stored under key, building it with factory() on a miss
+		"""
+		with self._lock:
+			if key in self._plans:
+				self.hits += 1
+				self._plans.move_to_end(key)
+				return self._plans[key]
+			self.misses += 1
+
+		plan = factory()
+		if isinstance(plan, np.ndarray):
+			plan.flags.writeable = False
+
+		with self._lock:
+			self._plans[key] = plan
+			self._plans.move_to_end(key)
+			while len(self._plans) > self.maxsize:
+				self._plans.popitem(last = False)
+		return plan
+
+	def info(self):
+		"""
+		info() - Returning the hits, misses, maximum size and current size of the registry, as a PlanCacheInfo named tuple
+		"""
+		with self._lock:
+			return PlanCacheInfo(self.hits, self.misses, self.maxsize, len(self._plans))
+
+	def clear(self):
+		"""
+		clear() - Removing every plan from the registry and resetting its statistics
+		"""
+		with self._lock:
+			self._plans.clear()
+			self.hits = self.misses = 0
+
+plan_cache = PlanCache()
+
+def zoom_fft_plan(n, f_min, f_max, desired_len, sampling_freq):
+	"""
+	zoom_fft_plan(n, f_min, f_max, desired_len, sampling_freq) - A cached scipy.signal.ZoomFFT object for signals of length n
+	"""
+	key = ('zoom_fft', n, float(f_min), float(f_max), desired_len, float(sampling_freq))
+	return plan_cache.get(key, lambda: scipy.signal.ZoomFFT(n, [f_min, f_max], desired_len, fs = sampling_freq))
+
+def window_plan(window, n):
+	"""
+	window_plan(window, n) - A cached, read-only window of length n
+
+	Arguments:
+	window -- A window specification accepted by scipy.signal.get_window(), e.g. 'hann' or ('kaiser', 8.0).
+	n -- Length of the window.
+	"""
+	return plan_cache.get(('window', window, n), lambda: scipy.signal.get_window(window, n))
+
+def sos_plan(order, cutoff, btype = 'bandpass', sampling_freq = None):
+	"""
+	sos_plan(order, cutoff, btype, sampling_freq) - A cached Butterworth filter in second-order sections format
+
+	Arguments:
+	order -- Order of the filter.
+	cutoff -- Critical frequency (or pair of frequencies for band-pass and band-stop filters), see scipy.signal.butter().
+	btype -- Type of the filter: 'lowpass', 'highpass', 'bandpass' or 'bandstop'. Defaults to 'bandpass'.
+	sampling_freq -- Sampling frequency; if given, cutoff is expressed in the same units (e.g. Hz).
+
+	Return Value:
+	A np.array() of second-order sections, to be used as the freq_filter argument of damavand.signal_processing.transformations functions. As
+	scipy.signal.sosfilt() requires writeable coefficients, a copy of the cached (and tiny) coefficients array is returned.
+	"""
+	cutoff = tuple(np.atleast_1d(cutoff).tolist())
+	key = ('sos', order, cutoff, btype, sampling_freq)
+	return plan_cache.get(key, lambda: scipy.signal.butter(order, cutoff if len(cutoff) > 1 else cutoff[0], btype, output = 'sos', fs = sampling_freq)).copy()
@@ -1,37 +1,131 @@
 import pandas as pd
 import scipy
 import numpy as np
+import os
+from contextlib import nullcontext
 from damavand.damavand.utils import *
+from damavand.damavand.signal_processing.plans import zoom_fft_plan, window_plan
 
-def env(signals):
+def _prepare(signals, freq_filter = None, window = None, dtype = None):
 	"""
-	env(signals) - Extracting the envelope of a set of signals
+	_prepare(signals, freq_filter, window, dtype) - Band-pass filtering and windowing a set of signals, as a floating point np.array() of the given dtype (by default, that of
+	the signals if floating, float64 otherwise); the input is never modified
+	"""
+	signals = np.asarray(signals, dtype = dtype)
+	if not np.issubdtype(signals.dtype, np.floating):
+		signals = signals.astype(float)
+
+	owned = False
+	if freq_filter is not None:
+		filtered = scipy.signal.sosfilt(freq_filter, signals)
+		signals, owned = filtered.astype(signals.dtype, copy = False), True
+
+	if isinstance(window, (str, tuple)):
+		window = window_plan(window, signals.shape[-1])
+
+	if window is not None:
+		if owned:
+			np.multiply(signals, window, out = signals, casting = 'same_kind')
+		else:
+			signals = np.multiply(signals, window, dtype = signals.dtype)
+
+	return signals
+
+def env(signals, return_df = True, workers = None, dtype = None):
+	"""
+	env(signals, return_df, workers, dtype) - Extracting the envelope of a set of signals
 
 	Arguments:
-	signals -- A pd.DataFrame() incuding signals in its rows.
+	signals -- A pd.DataFrame() or a 2-D np.array() incuding signals in its rows.
+	return_df -- Whether to return a pd.DataFrame() (default) or a np.array().
+	workers -- Maximum number of threads used by scipy.fft to transform the signals in parallel; defaults to a single thread.
+	dtype -- The floating point dtype of the computation and of the result (e.g. np.float32); defaults to that of the signals (float64 for non-floating signals).
 
 	Return Value:
-	A pd.DataFrame() whose rows are the envelopes of the signals stored in the inputted DataFrame.
+	A pd.DataFrame() (or np.array(), if return_df is False) whose rows are the envelopes of the inputted signals.
 
 	Descriptions:
 	This function extracts the envelope of signals, stored in a pd.DataFrame() object. This is done through the application of
 	Hilbert Transform (https://docs.scipy.org/doc/scipy/reference/generated/scipy.signal.hilbert.html); also np.abs() is used
-	to calculate the absolute magnitude, from both the imaginery and real parts.
+	to calculate the absolute magnitude, from both the imaginery and real parts. The analytic signal is derived from the one-sided
+	spectrum of the real-input FFT (scipy.fft.rfft()), so that only half of the forward transform is computed; float32 signals are
+	kept in single precision.
 	"""
+	signals = _prepare(signals, dtype = dtype)
+	n = signals.shape[-1]
+
+	spectrum = scipy.fft.rfft(signals, axis = -1, workers = workers)
+	spectrum[..., 1:(n + 1)//2] *= 2
+	envelopes = np.abs(scipy.fft.ifft(spectrum, n = n, axis = -1, workers = workers))
 
-	return pd.DataFrame(np.abs(scipy.signal.hilbert(signals)))
+	return pd.DataFrame(envelopes) if return_df else envelopes
 
-def fft(signals, freq_filter = None, window = None):
+def envelope_spectrum(signals, sampling_freq, band = None, f_max = None, decimate = False, window = None, return_df = True, workers = None, dtype = None):
 	"""
-	fft(signals, freq_filter, window) - Applying the Fast-Fourier Transform algorithim to derive frequency domain representation of a set of signals
+	envelope_spectrum(signals, sampling_freq, band, f_max, decimate, window, return_df, workers, dtype) - Deriving the envelope spectrum of a set of signals, in a single pass
+
+	Arguments:
+	signals -- A pd.DataFrame() or a 2-D np.array() incuding signals in its rows.
+	sampling_freq -- The sampling frequency of the inputted signals.
+	band -- A (f_min, f_max) tuple; the signals are band-passed to this frequency range (e.g. around a structural resonance) before their envelope is extracted. Defaults to the whole spectrum.
+	f_max -- Highest frequency of the returned envelope spectrum (e.g. a few harmonics of the fault frequencies); defaults to half of sampling_freq.
+	decimate -- Whether to compute the envelope at the lowest sampling rate that still holds the band and f_max, rather than at sampling_freq.
+	window -- A window object from scipy.signal.windows module (e.g. scipy.signal.windows.hann()), applied to the envelopes to encounter the leakage error, or a window specification of scipy.signal.get_window()
+	          (e.g. 'hann'); as the length of decimated envelopes varies, a specification is preferable when decimate is set.
+	return_df -- Whether to return a pd.DataFrame() (default) or a np.array().
+	workers -- Maximum number of threads used by scipy.fft to transform the signals in parallel; defaults to a single thread.
+	dtype -- The floating point dtype of the computation and of the result (e.g. np.float32); defaults to that of the signals (float64 for non-floating signals).
+
+	Return Value:
+	A pd.DataFrame() (or np.array(), if return_df is False) whose rows are the envelope spectra of the inputted signals, from 0 to f_max; the frequency axis is the one of damavand.signal_processing.fft(),
+	i.e. damavand.utils.fft_freq_axis(time_len, sampling_freq), truncated to the length of the rows.
+
+	Descriptions:
+	Equivalent to damavand.signal_processing.fft(damavand.signal_processing.env(signals), window = window), applied to band-passed signals, but computed in the frequency domain at once: the signals are
+	transformed once, band-passing keeps only the bins of the band (an ideal filter), and the analytic signal is derived from these bins only, shifted down to 0 Hz, which leaves its magnitude (the
+	envelope) unchanged. With decimate set, the inverse transform is shortened to the fewest samples holding the bins of the band and twice f_max: the envelope samples stay exact, and only the envelope
+	content above half of the reduced sampling rate (normally negligible for a narrow band) folds into the returned spectrum. Neither the full-length analytic signals nor the full-length envelope spectra are held in memory.
+	"""
+	signals = _prepare(signals, dtype = dtype)
+	n = signals.shape[-1]
+
+	f_low, f_high = (0, sampling_freq/2) if band is None else band
+	first = max(0, int(np.ceil(f_low * n / sampling_freq)))
+	last = min(n//2, int(np.floor(f_high * n / sampling_freq)))
+	if last < first:
+		raise ValueError(f'The band {band} holds no frequency bin of signals of length {n}.')
+	n_bins = n//2 if f_max is None else min(n//2, int(np.floor(f_max * n / sampling_freq)) + 1)
+	m = min(n, scipy.fft.next_fast_len(max(last - first + 1, 2*n_bins))) if decimate else n
+
+	# one-sided spectrum of the analytic signal, in the band: positive frequencies doubled, DC and Nyquist kept
+	bins = np.arange(first, last + 1)
+	weights = np.where((bins == 0) | (2*bins == n), 1, 2).astype(signals.dtype)
+	spectrum = np.multiply(scipy.fft.rfft(signals, axis = -1, workers = workers)[..., first : last + 1], weights)
+
+	envelopes = np.abs(scipy.fft.ifft(spectrum, n = m, axis = -1, workers = workers))
+	envelopes *= m/n
+	envelopes = _prepare(envelopes, window = window, dtype = signals.dtype)
+
+	spectra = np.abs(scipy.fft.rfft(envelopes, axis = -1, workers = workers)[..., 0:n_bins])
+	spectra *= 2.0/m
+
+	return pd.DataFrame(spectra) if return_df else spectra
+
+def fft(signals, freq_filter = None, window = None, return_df = True, workers = None, dtype = None):
+	"""
+	fft(signals, freq_filter, window, return_df, workers, dtype) - Applying the Fast-Fourier Transform algorithim to derive frequency domain representation of a set of signals
 
 	Arguemnts:
-	Signals -- A pd.DataFrame() incuding signals in its rows.
+	Signals -- A pd.DataFrame() or a 2-D np.array() incuding signals in its rows.
 	freq_filter -- A frequency filter object from scipy.signal module (e.g. scipy.signal.butter()) to avoid aliasing.
-	window -- A window object from scipy.signal.windows module (e.g. scipy.signal.windows.hann()) to encounter the leakage error.
+	window -- A window object from scipy.signal.windows module (e.g. scipy.signal.windows.hann()) to encounter the leakage error, or a window specification of scipy.signal.get_window()
+	          (e.g. 'hann'), built once per length and reused through damavand.signal_processing.plans.plan_cache.
+	return_df -- Whether to return a pd.DataFrame() (default) or a np.array().
+	workers -- Maximum number of threads used by scipy.fft to transform the signals in parallel; defaults to a single thread.
+	dtype -- The floating point dtype of the computation and of the result (e.g. np.float32); defaults to that of the signals (float64 for non-floating signals).
 
 	Return Value:
-	A pd.DataFrame whose rows are the frequency representations of the inputted DataFrame. As only the real frequency axis is of importance, the lenght of the frequency domain signals
+	A pd.DataFrame (or np.array(), if return_df is False) whose rows are the frequency representations of the inputted signals. As only the real frequency axis is of importance, the lenght of the frequency domain signals
 	is half of the original time domain signal.
 
 	Descriptions:
@@ -39,63 +133,73 @@ def fft(signals, freq_filter = None, window = None):
 	correpsonding to real frequency components (not the imaginery ones), lenght of the returned pd.DataFrame() is half of the inputted pd.DataFrame. freq_filter and window are not mandatory 
 	arguments and a function call without them is valid, however, we recommend using them to avoid aliasing (and of course near-zero/DC filtering through band-pass filters) and leakage error.
 	We encourage you to use frequency axis for the sake of visualization; this can be done using either of the followings: scipy.fft.fftfreq(), np.linspace() and
-	damavand.utils.fft_freq_axis().
+	damavand.utils.fft_freq_axis(). The real-input FFT (scipy.fft.rfft()) is used, so that the discarded half of the spectrum is never computed; float32 signals are kept in single precision.
 	"""
-	if freq_filter is not None:
-		signals = scipy.signal.sosfilt(freq_filter, signals)
+	signals = _prepare(signals, freq_filter, window, dtype)
+	n = signals.shape[-1]
 
-	if window is not None:
-		signals = signals * window
+	spectra = np.abs(scipy.fft.rfft(signals, axis = -1, workers = workers)[..., 0:n//2])
+	spectra *= 2.0/n
 
-	return pd.DataFrame(2.0/signals.shape[1] * np.abs(scipy.fft.fft(signals)[:, 0:signals.shape[1]//2]))
+	return pd.DataFrame(spectra) if return_df else spectra
 
 
-def zoomed_fft(signals, f_min, f_max, desired_len, sampling_freq, freq_filter = None, window = None):
+def zoomed_fft(signals, f_min, f_max, desired_len, sampling_freq, freq_filter = None, window = None, return_df = True, workers = None, dtype = None):
 	"""
-	ZoomedFFT(signals, time_len, f_min, f_max, desired_len, sampling_freq, freq_filter, window) - Applying the ZoomFFT algorithm to derive a fine-grained frequency representation
+	ZoomedFFT(signals, time_len, f_min, f_max, desired_len, sampling_freq, freq_filter, window, return_df, workers, dtype) - Applying the ZoomFFT algorithm to derive a fine-grained frequency representation
 	in a desired frequency range
 
 	Arguments:
-	signals -- A pd.DataFrame() incuding signals in its rows.
+	signals -- A pd.DataFrame() or a 2-D np.array() incuding signals in its rows.
 	f_min -- Minum of the desired frequency range.
 	f_max -- Maximum of the desired frequency range.
 	desired_len -- The desired length of the frequency domain representation.
 	sampling_freq -- The sampling frequency of the inputted pd.DataFrame().
 	freq_filter -- A frequency filter object from scipy.signal module (e.g. scipy.signal.butter()) to avoid aliasing.
-	window -- A window object from scipy.signal.windows module (e.g. scipy.signal.windows.hann()) to encounter the leakage error.
+	window -- A window object from scipy.signal.windows module (e.g. scipy.signal.windows.hann()) to encounter the leakage error, or a window specification of scipy.signal.get_window()
+	          (e.g. 'hann'), built once per length and reused through damavand.signal_processing.plans.plan_cache.
+	return_df -- Whether to return a pd.DataFrame() (default) or a np.array().
+	workers -- Maximum number of threads used by scipy.fft to transform the signals in parallel; defaults to a single thread.
+	dtype -- The floating point dtype of the result (e.g. np.float32); defaults to that of the signals (float64 for non-floating signals).
 
 	Return Value:
-	A pd.DataFrame whose rows are the frequency representations of the inputted DataFrame, in the desired frequency range and with the chosen lenght.
+	A pd.DataFrame (or np.array(), if return_df is False) whose rows are the frequency representations of the inputted signals, in the desired frequency range and with the chosen lenght.
 
 	Descriptions:
 	Using this function, one is able to derive a frequency represenation from the time domain signal in a desired frequency range and with the desired length. freq_filter and window are not mandatory 
 	arguments and a function call without them is valid, however, we recommend using them to avoid aliasing (and of course near-zero/DC filtering through band-pass filters) and leakage error.
 	We encourage you to use frequency axis for the sake of visualization; this can be done using either of the followings: np.linspace() or damavand.utils.ZoomedFFT_freq_axis().
+	The scipy.signal.ZoomFFT object is cached in damavand.signal_processing.plans.plan_cache, so that repeated calls with identical parameters reuse its precomputed chirps.
 
 	"""
-	if freq_filter is not None:
-		signals = scipy.signal.sosfilt(freq_filter, signals)
+	signals = _prepare(signals, freq_filter, window, dtype)
 
-	if window is not None:
-		signals = signals * window
+	transform = zoom_fft_plan(signals.shape[1], f_min, f_max, desired_len, sampling_freq)
 
-	transform = scipy.signal.ZoomFFT(signals.shape[1], [f_min, f_max], desired_len, fs = sampling_freq)
+	with scipy.fft.set_workers(workers) if workers is not None else nullcontext():
+		spectra = np.abs(transform(signals)).astype(signals.dtype, copy = False)
+	spectra *= 2/signals.shape[1]
 
-	return pd.DataFrame((2/signals.shape[1]) * np.abs(transform(signals)))
+	return pd.DataFrame(spectra) if return_df else spectra
 
-def stft(signals, window_len, hop_len, freq_filter = None, window = None):
+def stft(signals, window_len, hop_len, freq_filter = None, window = None, chunk_size = None, out = None, workers = None, dtype = None):
 	"""
-	STFT(signals, window_len, hop_len, freq_filter = None, window = None) - Application of Short-Time Fourier Transform to derive Time-Frequency representation of the inputted signals
+	STFT(signals, window_len, hop_len, freq_filter = None, window = None, chunk_size = None, out = None, workers = None, dtype = None) - Application of Short-Time Fourier Transform to derive Time-Frequency representation of the inputted signals
 
 	Arguemnts:
-	signals -- A pd.DataFrame() incuding signals in its rows.
+	signals -- A pd.DataFrame() or a 2-D np.array() incuding signals in its rows.
 	window_len -- Lenght of the desired time segments.
 	hop_len -- Length of the feed, used to get forward during the segmentation process.
 	freq_filter -- A frequency filter object from scipy.signal module (e.g. scipy.signal.butter()) to avoid aliasing.
-	window -- A window object from scipy.signal.windows module (e.g. scipy.signal.windows.hann()) to encounter the leakage error.
+	window -- A window object from scipy.signal.windows module (e.g. scipy.signal.windows.hann()) to encounter the leakage error, or a window specification of scipy.signal.get_window()
+	          (e.g. 'hann'), built once per length and reused through damavand.signal_processing.plans.plan_cache.
+	chunk_size -- Number of signals transformed at once; by default, it is chosen so that the segments of a chunk take about 64 MB.
+	out -- A preallocated np.array() (e.g. a np.memmap) to write the result into, or the path of a .npy file to create as a memory-mapped result.
+	workers -- Maximum number of threads used by scipy.fft to transform the segments in parallel; defaults to a single thread.
+	dtype -- The floating point dtype of the computation and of the result (e.g. np.float32); defaults to that of the signals (float64 for non-floating signals).
 
 	Return Value:
-	A np.array(), whose first dimension equals the number of rows included in the input pd.DataFrame; it includes derived Time-Frequency representations of the inputted signals. freq_filter and window are not mandatory 
+	A np.array() (or out), whose first dimension equals the number of rows included in the input pd.DataFrame; it includes derived Time-Frequency representations of the inputted signals. freq_filter and window are not mandatory 
 	arguments and a function call without them is valid, however, we recommend using them to avoid aliasing (and of course near-zero/DC filtering through band-pass filters) and leakage error. Pay attention that unlike
 	the case of damavand.signal_processing.fft() or damavand.signal_processing.zoomed_fft(), for this function you have to define freq_filter and window objects with a lenght that suits the segmented signals (equal to
 	the window_len argument), instead of the original signals, presented in the inputted pd.DataFrame().
@@ -103,13 +207,109 @@ def stft(signals, window_len, hop_len, freq_filter = None, window = None):
 	Descriptions:
 	By the application of this function, one is able to derive Time-Frequency representation; this is done by first segmenting the original signals to a series of shorter signals and consecutively FFT is applied on each
 	segmented signal to derive the corresponding frequency representation. Results are usually visualized as heatmaps, whose vertical axis is the frequency dimension and the horizontal one is left to time dimension. One
-	can use the damavand.utils.STFT_axises() to generate both time and frequency axises needed to visualize the resulting heatmaps.
+	can use the damavand.utils.STFT_axises() to generate both time and frequency axises needed to visualize the resulting heatmaps. Segments are strided views over the signals (see damavand.utils.window_view()) and signals
+	are transformed chunk by chunk with the real-input FFT, writing magnitudes straight into the output array, so that no copy of all segments of all signals is ever held in memory.
 	"""
-	splitted_signals = np.array(signals.apply(splitter, args = (window_len, hop_len, False), axis = 1).to_list())
-	if freq_filter is not None:
-		splitted_signals = scipy.signal.sosfilt(freq_filter, splitted_signals)
+	signals = np.asarray(signals)
+	if dtype is None:
+		dtype = signals.dtype if np.issubdtype(signals.dtype, np.floating) else np.dtype(float)
+	n_segments = max(0, (signals.shape[1] - window_len) // hop_len + 1)
+	shape = (signals.shape[0], n_segments, window_len//2)
 
-	if window is not None:
-		splitted_signals = splitted_signals * window
-		
-	return 2.0/splitted_signals.shape[2] * np.abs(scipy.fft.fft(splitted_signals)[:, :, 0:splitted_signals.shape[2]//2])
\ No newline at end of file
+	if out is None:
+		out = np.empty(shape, dtype = dtype)
+	elif isinstance(out, (str, os.PathLike)):
+		out = np.lib.format.open_memmap(out, mode = 'w+', dtype = dtype, shape = shape)
+	elif out.shape != shape:
+		raise ValueError(f'out has shape {out.shape}, but the result has shape {shape}.')
+
+	if chunk_size is None:
+		chunk_size = max(1, 2**23 // max(1, n_segments * window_len))
+
+	for start in range(0, signals.shape[0], chunk_size):
+		segments = _prepare(window_view(signals[start : start + chunk_size], window_len, hop_len, axis = 1), freq_filter, window, dtype)
+		spectra = scipy.fft.rfft(segments, axis = -1, workers = workers)[..., 0:window_len//2]
+		np.abs(spectra, out = out[start : start + chunk_size], casting = 'same_kind')
+		out[start : start + chunk_size] *= 2.0/window_len
+
+	return out
+
+class StreamingSTFT:
+	"""
+	StreamingSTFT(window_len, hop_len, freq_filter = None, window = None, workers = None, dtype = None) - Short-Time Fourier Transform of a continuous stream of samples, frame by frame
+
+	Arguments:
+	window_len -- Lenght of the time segments (frames).
+	hop_len -- Length of the feed, used to get forward during the segmentation process.
+	freq_filter -- A frequency filter in second-order sections format (e.g. scipy.signal.butter(..., output = 'sos') or damavand.signal_processing.plans.sos_plan()), applied to the stream.
+	window -- A window object from scipy.signal.windows module (e.g. scipy.signal.windows.hann()) of length window_len, or a window specification of scipy.signal.get_window() (e.g. 'hann').
+	workers -- Maximum number of threads used by scipy.fft to transform the frames in parallel; defaults to a single thread.
+	dtype -- The floating point dtype of the computation and of the frames (e.g. np.float32); defaults to float64.
+
+	Descriptions:
+	Samples are fed chunk by chunk, of any size, through update() (or flow()), which returns the spectral frames completed by the chunk only; frames start every hop_len samples
+	from the first sample of the stream and are scaled like the ones of damavand.signal_processing.stft(). A chunk is either a 1-D np.array() of samples or an N-D np.array() of
+	several synchronized channels (e.g. the rows of a 2-D one), with samples along its last axis. Only the last, incomplete frame of the stream is retained between updates, so
+	that the cost of an update is proportional to the new samples rather than to the length of the stream.
+	Unlike damavand.signal_processing.stft(), which filters every segment on its own, freq_filter is applied once to the whole stream and its state (the zi of scipy.signal.sosfilt())
+	is carried over from one chunk to the next; the frames thus equal the ones of damavand.signal_processing.stft() (without freq_filter) over the filtered stream,
+	scipy.signal.sosfilt(freq_filter, stream), whatever the chunks are.
+	"""
+	def __init__(self, window_len, hop_len, freq_filter = None, window = None, workers = None, dtype = None):
+		self.window_len = window_len
+		self.hop_len = hop_len
+		self.freq_filter = None if freq_filter is None else np.array(freq_filter, dtype = float)
+		self.window = window
+		self.workers = workers
+		self.dtype = np.dtype(float if dtype is None else dtype)
+		self.reset()
+
+	def reset(self):
+		"""
+		reset() - Discarding the samples fed so far and the state of the filter, to start a new stream
+		"""
+		self._buffer = None
+		self._skip = 0
+		self._zi = None
+		self.n_frames = 0
+
+	def update(self, chunk):
+		"""
+		update(chunk) - Feeding the next samples of the stream
+
+		Arguments:
+		chunk -- A np.array() of the next samples, along its last axis.
+
+		Return Value:
+		A np.array() of shape chunk.shape[:-1] + (n_frames, window_len//2), holding the magnitude spectra of the n_frames frames completed by the chunk (possibly none).
+		"""
+		chunk = np.asarray(chunk, dtype = self.dtype)
+		if self.freq_filter is not None and chunk.shape[-1] > 0:
+			if self._zi is None:
+				self._zi = np.zeros((self.freq_filter.shape[0],) + chunk.shape[:-1] + (2,))
+			filtered, self._zi = scipy.signal.sosfilt(self.freq_filter, chunk, axis = -1, zi = self._zi)
+			chunk = filtered.astype(self.dtype, copy = False)
+
+		# samples before the start of the next frame (when hop_len exceeds window_len) are skipped
+		skip = min(self._skip, chunk.shape[-1])
+		self._skip -= skip
+		chunk = chunk[..., skip:]
+
+		buffer = chunk if self._buffer is None else np.concatenate([self._buffer, chunk], axis = -1)
+		segments = window_view(buffer, self.window_len, self.hop_len, axis = -1)
+		n_frames = segments.shape[-2]
+		self._buffer = buffer[..., n_frames * self.hop_len:].copy()
+		self._skip += max(0, n_frames * self.hop_len - buffer.shape[-1])
+		self.n_frames += n_frames
+
+		segments = _prepare(segments, window = self.window, dtype = self.dtype)
+		frames = np.abs(scipy.fft.rfft(segments, axis = -1, workers = self.workers)[..., 0:self.window_len//2]).astype(self.dtype, copy = False)
+		frames *= 2.0/self.window_len
+		return frames
+
+	def flow(self, chunks):
+		"""
+		flow(chunks) - Lazily feeding a stream of chunks (e.g. the readings of a sensor), yielding the result of update() for each of them
+		"""
+		for chunk in chunks:
+			yield self.update(chunk)
\ No newline at end of file
@@ -2,19 +2,64 @@ import numpy as np
 import pandas as pd
 import scipy
 
-def splitter(array, win_len, hop_len, return_df = True):
-   N = array.shape[0]
-   m = 0
-   ids = []
-   while m + win_len <= N:
-      ids.append([m, m + win_len])
-      m = m + hop_len
-      
+def window_view(array, win_len, hop_len, axis = 0):
+   """
+   Read-only strided view of the windows of `array` along `axis`; no sample is copied.
+
+   The windows dimension replaces `axis` and the window samples are appended as the last dimension, e.g. a 1-D
+   array of N samples gives a (n_windows, win_len) view, with n_windows = (N - win_len) // hop_len + 1.
+   """
+   array = np.asarray(array)
+   axis = axis % array.ndim
+   if array.shape[axis] < win_len:
+      shape = array.shape[:axis] + (0,) + array.shape[axis + 1:] + (win_len,)
+      view = np.empty(shape, dtype = array.dtype)
+      view.flags.writeable = False
+      return view
+
+   windows = np.lib.stride_tricks.sliding_window_view(array, win_len, axis = axis)
+   return windows[(slice(None),) * axis + (slice(None, None, hop_len),)]
+
+def materialize(windows, return_df = True, dtype = None):
+   """
+   Copy a window view (see `window_view` and `splitter(..., as_view = True)`) into a contiguous, writeable array or pd.DataFrame, of the given `dtype` (that of the windows by default).
+   """
+   windows = np.array(windows, dtype = dtype, copy = True, order = 'C')
    if return_df:
-      return pd.DataFrame([array[i[0]: i[1]] for i in ids])
+      return pd.DataFrame(windows)
    else:
-      return np.array([array[i[0]: i[1]] for i in ids])
-    
+      return windows
+
+def splitter(array, win_len, hop_len, return_df = True, as_view = False, dtype = None, freq_filter = None, zero_phase = False):
+   """
+   Segment a 1-D signal into windows of `win_len` samples, taken every `hop_len` samples; the windows of a multichannel
+   (samples x channels) signal are (win_len x channels) arrays, stacked along the first dimension.
+
+   With `as_view = True`, a read-only np.ndarray view over `array` is returned instead of a copy, so that overlapping windows
+   share memory; use `materialize()` to turn it into an independent array or pd.DataFrame when needed.
+
+   `dtype` (e.g. np.float32, halving the memory of the windows) is the dtype of the windows; the signal is converted once, before
+   it is segmented. Defaults to the dtype of `array`; filtering (see below) keeps it, e.g. float32 signals stay in single precision.
+
+   `freq_filter` (second-order sections, e.g. scipy.signal.butter(..., output = 'sos')) filters the whole signal once, before it is
+   segmented, instead of every window on its own: overlapping samples are filtered once, and only the start of the signal, rather
+   than every window, bears the transient of the filter. With `zero_phase = True`, the signal is filtered forward and backward
+   (scipy.signal.sosfiltfilt()), with no phase distortion and no transient at all.
+   """
+   array = np.asarray(array, dtype = dtype)
+   if freq_filter is not None:
+      # scipy.signal filters upcast to float64; floating signals are cast back to their dtype
+      filtered = (scipy.signal.sosfiltfilt if zero_phase else scipy.signal.sosfilt)(freq_filter, array, axis = 0)
+      array = filtered.astype(array.dtype, copy = False) if np.issubdtype(array.dtype, np.floating) else filtered
+   windows = window_view(array, win_len, hop_len)
+   if array.ndim > 1:
+      # window_view() appends the window samples as the last dimension; they precede the channels
+      windows = np.moveaxis(windows, -1, 1)
+   if as_view:
+      return windows
+
+   return materialize(windows, return_df)
+
 def fft_freq_axis(time_len, sampling_freq):
    return scipy.fft.fftfreq(time_len, 1/float(sampling_freq))[0 : time_len // 2]
 
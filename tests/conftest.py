@@ -0,0 +1,11 @@
+import os
+import sys
+import types
+
+# The modules import each other as damavand.damavand.<module>, i.e. from the directory containing the repository; the
+# repository is registered as the `damavand` package, so that the tests run whatever the name of its directory is.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if 'damavand' not in sys.modules:
+	package = types.ModuleType('damavand')
+	package.__path__ = [ROOT]
+	sys.modules['damavand'] = package
@@ -0,0 +1,34 @@
+"""
+Augmentations of blocks of signals, including their edge cases.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from damavand.damavand.augmentations import gaussian_noise, masking_noise
+
+
+def _signals(n_signals = 4, n_samples = 10, seed = 0):
+	return pd.DataFrame(np.random.default_rng(seed).standard_normal((n_signals, n_samples)) + 5)
+
+@pytest.mark.parametrize('uniformity', [False, True])
+@pytest.mark.parametrize('ratio', [0, 0.35, 1])
+def test_masking_ratio(ratio, uniformity):
+	signals = _signals()
+	masked, masks = masking_noise(signals, ratio, uniformity = uniformity, return_mask = True, rng = np.random.default_rng(0))
+	masks = np.atleast_2d(np.asarray(masks))
+	assert masks.shape == (1 if uniformity else len(signals), signals.shape[1])
+	np.testing.assert_array_equal((masks == 0).sum(axis = 1), int(signals.shape[1] * ratio))
+	np.testing.assert_array_equal(masked.to_numpy(), signals.to_numpy() * masks)
+
+def test_gaussian_noise_skips_missing_samples():
+	signals = _signals(2, 50)
+	signals.iloc[0, 3] = np.nan
+	noisy, noises = gaussian_noise(signals, 10, return_noise = True, rng = np.random.default_rng(0))
+	np.testing.assert_array_equal(noisy.isna().sum(axis = 1).to_numpy(), [1, 0])
+	assert not noises.isna().any().any()
+
+	# the noise power of a signal is that of its available samples
+	powers = np.square(noises.to_numpy()).mean(axis = 1)
+	expected = np.nansum(np.square(signals.to_numpy()), axis = 1) / 10
+	np.testing.assert_allclose(powers, expected, rtol = 0.5)
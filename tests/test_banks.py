@@ -0,0 +1,36 @@
+"""
+Selection and conversion of SignalBank objects.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from damavand.damavand.datasets.banks import SignalBank
+
+
+def _bank():
+	return SignalBank.from_blocks([(np.arange(12.).reshape(3, 4), {'state': 'H'}), (np.arange(12., 20.).reshape(2, 4), {'state': 'IR'})])
+
+@pytest.mark.parametrize('row', [0, 3, -1, np.int64(4)])
+def test_scalar_index(row):
+	bank = _bank()
+	selected = bank[row]
+	assert len(selected) == 1
+	np.testing.assert_array_equal(selected.signals, bank.signals[[row]])
+	assert list(selected.metadata['state']) == [bank.metadata['state'].iloc[row]]
+
+def test_invalid_scalar_index():
+	with pytest.raises(TypeError):
+		_bank()[1.5]
+
+def test_index_and_mask():
+	bank = _bank()
+	assert list(bank[[0, 4]].metadata['state']) == ['H', 'IR']
+	assert len(bank.filter(state = 'IR')) == 2
+	np.testing.assert_array_equal(bank[1:3].signals, bank.signals[1:3])
+
+def test_frame_round_trip():
+	bank = _bank()
+	converted = SignalBank.from_frame(bank.to_frame())
+	np.testing.assert_array_equal(converted.signals, bank.signals)
+	pd.testing.assert_frame_equal(converted.metadata, bank.metadata)
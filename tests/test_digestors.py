@@ -0,0 +1,221 @@
+"""
+Mining of small synthetic datasets, laid out like the original ones.
+"""
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.io
+
+from damavand.damavand.datasets import digestors
+from damavand.damavand.datasets.digestors import UoO, CWRU, prune_cache
+
+MINING_PARAMS = {'win_len': 1000, 'hop_len': 500}
+
+
+def _write_uoo(directory, names, seed = 0):
+	rng = np.random.default_rng(seed)
+	for name in names:
+		scipy.io.savemat(directory / name, {'Channel_1': rng.standard_normal((3000, 1)), 'Channel_2': rng.standard_normal((3000, 1))})
+
+def _write_cwru(directory, names, seed = 0):
+	rng = np.random.default_rng(seed)
+	for i, name in enumerate(names):
+		scipy.io.savemat(directory / name, {f'X{100 + i}_DE_time': rng.standard_normal((3000, 1)), f'X{100 + i}_FE_time': rng.standard_normal((3000, 1))})
+
+def test_index_follows_added_files(tmp_path):
+	_write_uoo(tmp_path, ['H-A-1.mat', 'I-A-1.mat'])
+	dataset = UoO(str(tmp_path) + '/', ['Channel_1'], [1])
+	dataset.mine(MINING_PARAMS)
+	assert len(dataset.index()) == 2
+
+	_write_uoo(tmp_path, ['O-A-1.mat'], seed = 1)
+	assert len(dataset.index()) == 3
+	dataset.data = {'Channel_1': []}
+	dataset.mine(MINING_PARAMS)
+	assert len(dataset.data['Channel_1']) == 3
+
+def test_index_follows_attributes(tmp_path):
+	_write_uoo(tmp_path, ['H-A-1.mat', 'H-A-2.mat', 'I-A-1.mat'])
+	dataset = UoO(str(tmp_path) + '/', ['Channel_1'], [1])
+	assert len(dataset.index()) == 2
+	dataset.reps = [1, 2]
+	assert len(dataset.index()) == 3
+
+def test_cwru_added_sampling_frequency(tmp_path):
+	_write_cwru(tmp_path, ['normal_1797_12K.mat'])
+	dataset = CWRU(str(tmp_path) + '/', ['DE'])
+	_write_cwru(tmp_path, ['DE_IR_007_1797_48K.mat'], seed = 1)
+	dataset.mine({'12K': MINING_PARAMS, '48K': MINING_PARAMS})
+	assert sorted(dataset.data['DE']) == ['12K', '48K']
+	assert len(dataset.data['DE']['48K']) == 1
+
+def test_mining_as_bank_after_frames(tmp_path):
+	_write_uoo(tmp_path, ['H-A-1.mat', 'I-A-1.mat'])
+	dataset = UoO(str(tmp_path) + '/', ['Channel_1'], [1])
+	dataset.mine(MINING_PARAMS, query = {'state': 'H'})
+	dataset.mine(MINING_PARAMS, query = {'state': 'I'}, as_bank = True)
+	bank = dataset.data['Channel_1']
+	assert len(bank) == 10
+	assert list(bank.metadata['state']) == ['H'] * 5 + ['I'] * 5
+
+	dataset.mine(MINING_PARAMS, query = {'state': 'H'})
+	frames = dataset.data['Channel_1']
+	assert [len(frame) for frame in frames] == [10, 5]
+	np.testing.assert_array_equal(frames[0].iloc[:, :1000].to_numpy(), bank.signals)
+	assert list(frames[1]['state']) == ['H'] * 5
+
+def _memory_mapped(array):
+	while array is not None and not isinstance(array, np.memmap):
+		array = array.base
+	return array is not None
+
+def test_cache_hits_are_not_copied(tmp_path):
+	data_dir = tmp_path / 'data'
+	data_dir.mkdir()
+	_write_uoo(data_dir, ['H-A-1.mat'])
+	cache_dir = str(tmp_path / 'cache')
+	UoO(str(data_dir) + '/', ['Channel_1'], [1]).mine(MINING_PARAMS, cache_dir = cache_dir)
+
+	frames = UoO(str(data_dir) + '/', ['Channel_1'], [1])
+	frames.mine(MINING_PARAMS, cache_dir = cache_dir)
+	frame = frames.data['Channel_1'][0]
+	assert _memory_mapped(frame[0].to_numpy())
+	frame.iloc[0, 0] = 1e3
+
+	bank = UoO(str(data_dir) + '/', ['Channel_1'], [1])
+	bank.mine(MINING_PARAMS, cache_dir = cache_dir, as_bank = True)
+	assert _memory_mapped(bank.data['Channel_1'].signals)
+	assert bank.data['Channel_1'].signals[0, 0] != 1e3
+
+def test_stale_cache_entries_are_pruned(tmp_path):
+	data_dir = tmp_path / 'data'
+	data_dir.mkdir()
+	_write_uoo(data_dir, ['H-A-1.mat', 'I-A-1.mat'])
+	cache_dir = tmp_path / 'cache'
+	dataset = UoO(str(data_dir) + '/', ['Channel_1'], [1])
+	dataset.mine(MINING_PARAMS, cache_dir = str(cache_dir))
+	dataset.mine({'win_len': 500, 'hop_len': 500}, cache_dir = str(cache_dir))
+	assert sorted(len(list(file_dir.iterdir())) for file_dir in cache_dir.iterdir()) == [2, 2]
+
+	_write_uoo(data_dir, ['H-A-1.mat'], seed = 1)
+	os.utime(data_dir / 'H-A-1.mat', ns = (1, 1))
+	dataset.mine(MINING_PARAMS, cache_dir = str(cache_dir))
+	assert sorted(len(list(file_dir.iterdir())) for file_dir in cache_dir.iterdir()) == [1, 2]
+
+	os.remove(data_dir / 'I-A-1.mat')
+	assert len(prune_cache(str(cache_dir))) == 2
+	assert [len(list(file_dir.iterdir())) for file_dir in cache_dir.iterdir()] == [1]
+
+def _age(directory):
+	# listings of directories modified in the last seconds are not reused
+	past = time.time_ns() - 10 * 10**9
+	os.utime(directory, ns = (past, past))
+
+def test_listing_is_reused(tmp_path, monkeypatch):
+	listed = []
+	listdir = digestors._listdir
+	monkeypatch.setattr(digestors, '_listdir', lambda path: listed.append(path) or listdir(path))
+
+	_write_cwru(tmp_path, ['normal_1797_12K.mat', 'DE_IR_007_1797_48K.mat'])
+	_age(tmp_path)
+	dataset = CWRU(str(tmp_path) + '/', ['DE'])
+	dataset.mine({'12K': MINING_PARAMS, '48K': MINING_PARAMS})
+	list(dataset.iter_mine({'12K': MINING_PARAMS, '48K': MINING_PARAMS}))
+	assert len(listed) == 1
+
+	_write_cwru(tmp_path, ['normal_1772_12K.mat'], seed = 1)
+	assert len(dataset.index()) == 3
+	assert len(listed) == 2
+
+	dataset.channels = ['DE', 'FE']
+	dataset.index()
+	assert len(listed) == 3
+
+def test_mine_without_query_skips_the_index(tmp_path, monkeypatch):
+	_write_uoo(tmp_path, ['H-A-1.mat'])
+	monkeypatch.setattr(digestors, 'file_size', lambda path: pytest.fail('the index was built'))
+	UoO(str(tmp_path) + '/', ['Channel_1'], [1]).mine(MINING_PARAMS)
+
+def _assert_same_data(data, expected):
+	assert list(data) == list(expected)
+	for key in expected:
+		if isinstance(expected[key], dict):
+			_assert_same_data(data[key], expected[key])
+		else:
+			assert len(data[key]) == len(expected[key])
+			for frame, expected_frame in zip(data[key], expected[key]):
+				pd.testing.assert_frame_equal(frame, expected_frame)
+
+def _cwru(directory):
+	directory.mkdir()
+	_write_cwru(directory, ['normal_1797_12K.mat', 'DE_IR_007_1797_12K.mat', 'FE_OR_014_1750_48K.mat', 'DE_B_021_1730_48K.mat'])
+	return lambda: CWRU(str(directory) + '/', ['DE', 'FE'])
+
+def test_parallel_mining_equals_serial(tmp_path):
+	_write_uoo(tmp_path, ['H-A-1.mat', 'I-A-1.mat', 'O-A-1.mat', 'H-B-1.mat'])
+	serial = UoO(str(tmp_path) + '/', ['Channel_1', 'Channel_2'], [1])
+	serial.mine(MINING_PARAMS)
+	parallel = UoO(str(tmp_path) + '/', ['Channel_1', 'Channel_2'], [1])
+	parallel.mine(MINING_PARAMS, n_workers = 2)
+	_assert_same_data(parallel.data, serial.data)
+
+	cwru = _cwru(tmp_path / 'cwru')
+	serial, parallel = cwru(), cwru()
+	serial.mine({'12K': MINING_PARAMS, '48K': MINING_PARAMS})
+	parallel.mine({'12K': MINING_PARAMS, '48K': MINING_PARAMS}, n_workers = 2)
+	_assert_same_data(parallel.data, serial.data)
+
+def test_merged_shards_equal_mining(tmp_path):
+	data_dir = tmp_path / 'uoo'
+	data_dir.mkdir()
+	_write_uoo(data_dir, ['H-A-1.mat', 'I-A-1.mat', 'O-A-1.mat', 'H-B-1.mat', 'I-B-1.mat'])
+	cwru = _cwru(tmp_path / 'cwru')
+	datasets = [
+		(lambda: UoO(str(data_dir) + '/', ['Channel_1', 'Channel_2'], [1]), MINING_PARAMS),
+		(cwru, {'12K': MINING_PARAMS, '48K': MINING_PARAMS}),
+	]
+	for i, (dataset, mining_params) in enumerate(datasets):
+		expected = dataset()
+		expected.mine(mining_params)
+
+		output_dirs = [str(tmp_path / f'shards_{i}' / str(shard)) for shard in range(3)]
+		for shard, output_dir in enumerate(output_dirs):
+			dataset().mine_shard(mining_params, shard, len(output_dirs), output_dir)
+		sharded = []
+		for output_dir in output_dirs:
+			with open(os.path.join(output_dir, 'shard.json')) as f:
+				sharded.append(json.load(f)['files'])
+		assert sum(1 for files in sharded if files) > 1
+		assert sorted(path for files in sharded for path in files) == sorted(os.path.relpath(path, expected.base_dir) for path in expected.index()['path'])
+
+		merged = dataset()
+		merged.merge_shards(output_dirs)
+		_assert_same_data(merged.data, expected.data)
+
+def test_iter_mine_batches(tmp_path):
+	data_dir = tmp_path / 'uoo'
+	data_dir.mkdir()
+	_write_uoo(data_dir, ['H-A-1.mat', 'I-A-1.mat', 'O-A-1.mat', 'H-B-1.mat', 'I-B-1.mat'])
+	cwru = _cwru(tmp_path / 'cwru')
+	datasets = [
+		(lambda: UoO(str(data_dir) + '/', ['Channel_1', 'Channel_2'], [1]), MINING_PARAMS, lambda data, key: data[key], 2),
+		(cwru, {'12K': MINING_PARAMS, '48K': MINING_PARAMS}, lambda data, key: data[key[0]][key[1]], 4),
+	]
+	for dataset, mining_params, slot, n_keys in datasets:
+		expected = dataset()
+		expected.mine(mining_params, as_bank = True)
+
+		batches = {}
+		for key, bank in dataset().iter_mine(mining_params, batch_size = 7):
+			batches.setdefault(key, []).append(bank)
+		assert len(batches) == n_keys
+		for key, banks in batches.items():
+			total = len(slot(expected.data, key))
+			assert [len(bank) for bank in banks] == [7] * (total // 7) + ([total % 7] if total % 7 else [])
+			np.testing.assert_array_equal(np.concatenate([bank.signals for bank in banks]), slot(expected.data, key).signals)
+			pd.testing.assert_frame_equal(pd.concat([bank.metadata.astype(str) for bank in banks], ignore_index = True), slot(expected.data, key).metadata.astype(str))
+		assert sum(len(banks) for banks in batches.values()) > len(batches)
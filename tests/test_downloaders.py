@@ -0,0 +1,146 @@
+"""
+Downloads from a local HTTP server supporting (or not) Range requests.
+"""
+import functools
+import http.server
+import os
+import re
+import threading
+
+import pytest
+
+from damavand.damavand.datasets.downloaders import download_file, download_files, CwruDownloader
+
+CONTENT = bytes(range(256)) * 400
+
+
+class _Handler(http.server.SimpleHTTPRequestHandler):
+	"""
+	Serves the files of a directory, honouring `Range: bytes=<start>-` headers if `ranges` is set; files listed in `truncated` are cut in half once.
+	"""
+	ranges = True
+	truncated = set()
+	requests = []
+
+	def log_message(self, *args):
+		pass
+
+	def do_GET(self):
+		name = self.path.lstrip('/')
+		type(self).requests.append((name, self.headers.get('Range')))
+		path = os.path.join(self.directory, name)
+		if not os.path.isfile(path):
+			self.send_error(404)
+			return
+		with open(path, 'rb') as f:
+			data = f.read()
+
+		start = 0
+		match = re.match(r'bytes=(\d+)-', self.headers.get('Range') or '')
+		if match and self.ranges:
+			start = int(match.group(1))
+			if start >= len(data):
+				self.send_response(416)
+				self.send_header('Content-Range', f'bytes */{len(data)}')
+				self.send_header('Content-Length', '0')
+				self.end_headers()
+				return
+			self.send_response(206)
+			self.send_header('Content-Range', f'bytes {start}-{len(data) - 1}/{len(data)}')
+		else:
+			self.send_response(200)
+		body = data[start:]
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+
+		if name in self.truncated:
+			type(self).truncated.discard(name)
+			self.close_connection = True
+			body = body[:len(body) // 2]
+		self.wfile.write(body)
+
+
+@pytest.fixture
+def server(tmp_path):
+	served = tmp_path / 'served'
+	served.mkdir()
+	(served / 'a.mat').write_bytes(CONTENT)
+	(served / 'b.mat').write_bytes(CONTENT[::-1])
+
+	handler = type('Handler', (_Handler,), {'ranges': True, 'truncated': set(), 'requests': []})
+	httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(handler, directory = str(served)))
+	thread = threading.Thread(target = httpd.serve_forever, daemon = True)
+	thread.start()
+	yield handler, f'http://127.0.0.1:{httpd.server_address[1]}/'
+	httpd.shutdown()
+	httpd.server_close()
+
+@pytest.fixture
+def download_path(tmp_path):
+	path = tmp_path / 'downloads'
+	path.mkdir()
+	return path
+
+
+def test_resume(server, download_path):
+	handler, url = server
+	(download_path / 'a.tmp').write_bytes(CONTENT[:1000])
+	download_file(url + 'a.mat', str(download_path / 'a.mat'))
+
+	assert (download_path / 'a.mat').read_bytes() == CONTENT
+	assert not (download_path / 'a.tmp').exists()
+	assert handler.requests == [('a.mat', 'bytes=1000-')]
+
+def test_rangeless_server_overwrites(server, download_path):
+	handler, url = server
+	handler.ranges = False
+	(download_path / 'a.tmp').write_bytes(b'x' * 1000)
+	download_file(url + 'a.mat', str(download_path / 'a.mat'))
+
+	assert (download_path / 'a.mat').read_bytes() == CONTENT
+
+def test_unsatisfiable_range_restarts(server, download_path):
+	# a partial file at least as long as the remote one (e.g. of a former version) can not be resumed
+	handler, url = server
+	(download_path / 'a.tmp').write_bytes(b'x' * (len(CONTENT) + 10))
+	download_file(url + 'a.mat', str(download_path / 'a.mat'))
+
+	assert (download_path / 'a.mat').read_bytes() == CONTENT
+	assert handler.requests == [('a.mat', f'bytes={len(CONTENT) + 10}-'), ('a.mat', None)]
+
+def test_truncated_download_is_resumed(server, download_path):
+	handler, url = server
+	handler.truncated.add('a.mat')
+	# chunks smaller than the response, so that the received part is written before the connection breaks
+	errors = download_files({'a.mat': url + 'a.mat'}, str(download_path), chunk_size = 4096, retries = 0)
+	assert list(errors) == ['a.mat']
+	assert not (download_path / 'a.mat').exists()
+	partial = (download_path / 'a.tmp').stat().st_size
+	assert 0 < partial < len(CONTENT)
+
+	assert download_files({'a.mat': url + 'a.mat'}, str(download_path), chunk_size = 4096, retries = 0) == {}
+	assert (download_path / 'a.mat').read_bytes() == CONTENT
+	assert handler.requests[-1] == ('a.mat', f'bytes={partial}-')
+
+def test_missing_file_is_undownloaded(server, download_path):
+	handler, url = server
+	files = {'a.mat': url + 'a.mat', 'b.mat': url + 'b.mat', 'c.mat': url + 'missing.mat'}
+	downloader = CwruDownloader(files)
+	downloader.download(str(download_path), delay = 0)
+
+	assert list(downloader.undownloaded) == ['c.mat']
+	assert (download_path / 'a.mat').read_bytes() == CONTENT
+	assert (download_path / 'b.mat').read_bytes() == CONTENT[::-1]
+	assert not (download_path / 'c.mat').exists()
+
+def test_valid_files_are_skipped(server, download_path):
+	handler, url = server
+	files = {'a.mat': {'url': url + 'a.mat', 'size': len(CONTENT)}}
+	assert download_files(files, str(download_path)) == {}
+	assert download_files(files, str(download_path)) == {}
+	assert len(handler.requests) == 1
+
+	(download_path / 'a.mat').write_bytes(CONTENT[:100])
+	assert download_files(files, str(download_path)) == {}
+	assert (download_path / 'a.mat').read_bytes() == CONTENT
+	assert len(handler.requests) == 2
@@ -0,0 +1,110 @@
+"""
+Agreement of the float32 fast path (dtype = np.float32) with the default, float64 computations.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import scipy
+import scipy.io
+
+from damavand.damavand.utils import splitter
+from damavand.damavand.signal_processing.transformations import fft, env, zoomed_fft, stft
+from damavand.damavand.augmentations import gaussian_noise, masking_noise, amplitude_shifting, resampling, AugmentationPipeline
+from damavand.damavand.datasets.digestors import UoO
+
+
+def _signals(n_signals = 16, n_samples = 4096, seed = 0):
+	rng = np.random.default_rng(seed)
+	t = np.arange(n_samples) / 12000
+	return np.sin(2 * np.pi * 3000 * t) * (1 + 0.5 * np.cos(2 * np.pi * 107 * t)) + 0.3 * rng.standard_normal((n_signals, n_samples))
+
+def _assert_agree(single, double, tolerance = 1e-5):
+	# errors are relative to the largest magnitude, as float32 resolves about 1e-7 of it
+	assert single.dtype == np.float32
+	assert single.shape == double.shape
+	np.testing.assert_allclose(single, double, rtol = 0, atol = tolerance * np.max(np.abs(double)))
+
+
+def test_splitter():
+	signal = _signals(1, 20000)[0]
+	double = splitter(signal, 1000, 400, return_df = False)
+	single = splitter(signal, 1000, 400, return_df = False, dtype = np.float32)
+	assert single.dtype == np.float32
+	np.testing.assert_array_equal(single, double.astype(np.float32))
+	assert (splitter(signal.astype(np.float32), 1000, 400).dtypes == np.float32).all()
+
+@pytest.mark.parametrize('zero_phase', [False, True])
+def test_splitter_filtered(zero_phase):
+	signal = _signals(1, 20000)[0]
+	sos = scipy.signal.butter(4, [0.05, 0.4], 'bandpass', output = 'sos')
+	double = splitter(signal, 1000, 400, return_df = False, freq_filter = sos, zero_phase = zero_phase)
+	_assert_agree(splitter(signal, 1000, 400, return_df = False, dtype = np.float32, freq_filter = sos, zero_phase = zero_phase), double)
+	_assert_agree(splitter(signal.astype(np.float32), 1000, 400, return_df = False, freq_filter = sos, zero_phase = zero_phase), double)
+
+@pytest.mark.parametrize('transform, kwargs', [
+	(fft, {}),
+	(fft, {'window': 'hann', 'freq_filter': scipy.signal.butter(4, [0.05, 0.4], 'bandpass', output = 'sos')}),
+	(env, {}),
+	(zoomed_fft, {'f_min': 50, 'f_max': 500, 'desired_len': 256, 'sampling_freq': 12000, 'window': 'hann'}),
+])
+def test_transforms(transform, kwargs):
+	signals = _signals()
+	double = transform(signals, return_df = False, **kwargs)
+	_assert_agree(transform(signals, return_df = False, dtype = np.float32, **kwargs), double)
+	_assert_agree(transform(signals.astype(np.float32), return_df = False, **kwargs), double)
+
+def test_stft():
+	signals = _signals()
+	double = stft(signals, 256, 128, window = 'hann')
+	_assert_agree(stft(signals, 256, 128, window = 'hann', dtype = np.float32), double)
+	_assert_agree(stft(signals.astype(np.float32), 256, 128, window = 'hann'), double)
+
+def test_gaussian_noise():
+	# float32 noises are drawn by another algorithm than float64 ones, so only their powers are compared
+	signals = pd.DataFrame(_signals())
+	powers = {}
+	for dtype in [None, np.float32]:
+		noisy, noises = gaussian_noise(signals, 10, return_noise = True, rng = np.random.default_rng(0), dtype = dtype)
+		assert noisy.to_numpy().dtype == noises.to_numpy().dtype == (np.float32 if dtype else np.float64)
+		np.testing.assert_allclose((noisy - signals).to_numpy(), noises.to_numpy(), atol = 1e-5)
+		powers[dtype] = np.mean(np.square(noises.to_numpy(dtype = float)), axis = 1)
+	np.testing.assert_allclose(powers[np.float32], powers[None], rtol = 0.1)
+
+def test_masking_noise():
+	signals = pd.DataFrame(_signals())
+	double, double_masks = masking_noise(signals, 0.2, return_mask = True, rng = np.random.default_rng(0))
+	single, single_masks = masking_noise(signals, 0.2, return_mask = True, rng = np.random.default_rng(0), dtype = np.float32)
+	np.testing.assert_array_equal(single_masks.to_numpy(), double_masks.to_numpy())
+	np.testing.assert_array_equal(single.to_numpy(), double.to_numpy().astype(np.float32))
+
+def test_amplitude_shifting_and_resampling():
+	signals = pd.DataFrame(_signals())
+	coefficients = list(np.linspace(0.8, 1.2, len(signals)))
+	_assert_agree(amplitude_shifting(signals, coefficients, dtype = np.float32).to_numpy(), amplitude_shifting(signals, coefficients).to_numpy())
+	_assert_agree(resampling(signals, 1000, dtype = np.float32).to_numpy(), resampling(signals, 1000).to_numpy())
+
+def test_pipeline():
+	signals = _signals()
+	pipeline = AugmentationPipeline([(masking_noise, {'ratio': 0.1}), (amplitude_shifting, {'coefficients': 2.0})], seed = 0)
+	double = pipeline(signals)
+	pipeline = AugmentationPipeline([(masking_noise, {'ratio': 0.1}), (amplitude_shifting, {'coefficients': 2.0})], seed = 0, dtype = np.float32)
+	_assert_agree(pipeline(signals), double)
+
+def test_mine(tmp_path):
+	rng = np.random.default_rng(0)
+	for name in ['H-A-1.mat', 'I-A-1.mat', 'O-D-3.mat']:
+		scipy.io.savemat(tmp_path / name, {'Channel_1': rng.standard_normal((6000, 1)), 'Channel_2': rng.standard_normal((6000, 1))})
+	mining_params = {'win_len': 1000, 'hop_len': 400}
+
+	double, single = UoO(str(tmp_path) + '/', ['Channel_1', 'Channel_2'], [1, 3]), UoO(str(tmp_path) + '/', ['Channel_1', 'Channel_2'], [1, 3])
+	double.mine(mining_params)
+	single.mine(mining_params, dtype = np.float32)
+	for channel in double.data:
+		assert len(single.data[channel]) == len(double.data[channel]) == 3
+		for single_frame, double_frame in zip(single.data[channel], double.data[channel]):
+			_assert_agree(single_frame.iloc[:, :1000].to_numpy(), double_frame.iloc[:, :1000].to_numpy(), 1e-7)
+			pd.testing.assert_frame_equal(single_frame.iloc[:, 1000:], double_frame.iloc[:, 1000:])
+
+	bank = UoO(str(tmp_path) + '/', ['Channel_1', 'Channel_2'], [1, 3])
+	bank.mine(mining_params, as_bank = True, dtype = np.float32)
+	assert bank.data['Channel_1'].signals.dtype == np.float32
@@ -0,0 +1,58 @@
+"""
+Batched (FeaturePlan) and streaming (StreamingFeatures) feature extraction against the per-row definitions of the features, applied to pd.Series.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from damavand.damavand.signal_processing import feature_extraction as fe
+from damavand.damavand.utils import splitter
+
+TIME_FEATURES = ['rms', 'smsa', 'peak', 'crest_factor', 'clearance_factor', 'shape_factor', 'impulse_factor']
+SPECTRAL_FEATURES = ['spectral_centroid'] + ['P%d' % i for i in range(17, 25)]
+
+
+def _signals(missing):
+	rng = np.random.default_rng(0)
+	signals = rng.standard_normal((8, 512))
+	if missing:
+		signals[0, 5] = np.nan
+		signals[1, ::3] = np.nan
+	return signals
+
+def _per_row(signals, func, *args):
+	return signals.apply(lambda row: func(row, *args), axis = 1).to_numpy()
+
+@pytest.mark.parametrize('missing', [False, True])
+def test_time_features(missing):
+	signals = pd.DataFrame(_signals(missing))
+	features = fe.feature_extractor(signals, {name: (getattr(fe, name), (), {}) for name in TIME_FEATURES})
+	for name in TIME_FEATURES:
+		expected = _per_row(signals, getattr(fe, name))
+		assert not np.isnan(expected).any()
+		np.testing.assert_allclose(features[name].to_numpy(), expected, rtol = 1e-10)
+
+@pytest.mark.filterwarnings('ignore:invalid value encountered in sqrt')  # P24 of bins below the centroid, in the per-row definition
+@pytest.mark.parametrize('missing', [False, True])
+def test_spectral_features(missing):
+	spectra = pd.DataFrame(np.abs(_signals(missing)))
+	freq_axis = np.linspace(1, 1000, spectra.shape[1])
+	features = fe.feature_extractor(spectra, {name: (getattr(fe, name), (freq_axis,), {}) for name in SPECTRAL_FEATURES})
+	for name in SPECTRAL_FEATURES:
+		np.testing.assert_allclose(features[name].to_numpy(), _per_row(spectra, getattr(fe, name), freq_axis), rtol = 1e-10)
+
+@pytest.mark.parametrize('win_len, hop_len', [(1000, 100), (1000, 1000), (1000, 300), (256, 512), (7, 3), (100, 1)])
+def test_streaming_features(win_len, hop_len):
+	rng = np.random.default_rng(0)
+	stream = rng.standard_normal(20000) * np.linspace(1, 5, 20000)
+	features = {name: (getattr(fe, name), (), {}) for name in TIME_FEATURES}
+	expected = fe.feature_extractor(splitter(stream, win_len, hop_len), features)
+
+	extractor = fe.StreamingFeatures(features, win_len, hop_len)
+	chunks = np.split(stream, np.sort(rng.integers(0, len(stream), 60)))
+	streamed = pd.concat(list(extractor.flow(chunks)))
+	pd.testing.assert_frame_equal(streamed, expected, check_index_type = False, rtol = 1e-10)
+
+	extractor.reset()
+	assert extractor.update(stream[:win_len - 1]).empty
+	pd.testing.assert_frame_equal(extractor.update(stream[win_len - 1:win_len]), expected.iloc[:1], check_index_type = False, rtol = 1e-10)
@@ -0,0 +1,32 @@
+"""
+Windowing of single and multichannel signals against the windows sliced one by one.
+"""
+import numpy as np
+import pytest
+import scipy.signal
+
+from damavand.damavand.utils import splitter, materialize
+
+
+def _sliced(array, win_len, hop_len):
+	return np.array([array[start : start + win_len] for start in range(0, len(array) - win_len + 1, hop_len)])
+
+@pytest.mark.parametrize('shape', [(20,), (20, 2), (20, 2, 3)])
+def test_splitter_layout(shape):
+	array = np.arange(np.prod(shape), dtype = float).reshape(shape)
+	expected = _sliced(array, 4, 3)
+	windows = splitter(array, 4, 3, return_df = False)
+	assert windows.shape == expected.shape
+	np.testing.assert_array_equal(windows, expected)
+	assert windows.flags.c_contiguous
+
+	view = splitter(array, 4, 3, as_view = True)
+	np.testing.assert_array_equal(view, expected)
+	assert materialize(view, return_df = False).flags.c_contiguous
+
+def test_splitter_filters_every_channel_along_time():
+	array = np.random.default_rng(0).standard_normal((200, 2))
+	sos = scipy.signal.butter(2, 0.2, output = 'sos')
+	windows = splitter(array, 50, 25, return_df = False, freq_filter = sos)
+	for channel in range(2):
+		np.testing.assert_allclose(windows[:, :, channel], splitter(array[:, channel], 50, 25, return_df = False, freq_filter = sos))